@@ -1,97 +1,190 @@
+import heapq
 import json
+import re
+import sys
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from collections import defaultdict, Counter
+from functools import cached_property
+from operator import itemgetter
 import pandas as pd
+from scipy import sparse
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _shared_variable_counts(tag_indptr, tag_vars, var_indptr, var_tags, n_tags):
+        """Upper-triangular tag x tag matrix of shared variable counts"""
+        counts = np.zeros((n_tags, n_tags), dtype=np.int32)
+        # Each tag owns its row, so parallel iterations never write the same cell
+        for t in prange(n_tags):
+            for e in range(tag_indptr[t], tag_indptr[t + 1]):
+                v = tag_vars[e]
+                for k in range(var_indptr[v], var_indptr[v + 1]):
+                    other = var_tags[k]
+                    if other > t:
+                        counts[t, other] += 1
+        return counts
+
 
 class GTMGraphVisualizer:
+    # Naming-pattern keywords in priority order: the first substring hit wins
+    _CATEGORY_KEYWORDS = (
+        ('session', 'Session'),
+        ('transaction', 'Ecommerce'), ('purchase', 'Ecommerce'), ('revenue', 'Ecommerce'),
+        ('item', 'Item'),
+        ('currency', 'Currency'),
+        ('firestore', 'Firestore'),
+        ('cookie', 'Cookie'), ('_fb', 'Cookie'), ('_ga', 'Cookie'),
+        ('page_', 'Page'), ('hostname', 'Page'),
+        ('user', 'User'), ('client_id', 'User'),
+        ('cd', 'Custom Dimension'), ('dimension', 'Custom Dimension'),
+        ('cg', 'Custom Group'),
+        ('event', 'Event'),
+        ('campaign', 'Campaign'),
+        ('facebook', 'Facebook'), ('fb ', 'Facebook'),
+        ('tiktok', 'TikTok'), ('ttclid', 'TikTok'), ('_ttp', 'TikTok'),
+        ('bing', 'Bing'), ('_uet', 'Bing'),
+        ('meiro', 'Meiro'),
+        ('const', 'Constant'), ('undefined', 'Constant'),
+        ('header', 'Header'),
+        ('domain', 'Domain'),
+        ('test', 'Test'),
+    )
+    # Alphanumeric keywords can be found by exact token lookup -> priority index
+    _TOKEN_PRIORITY = {kw: i for i, (kw, _) in enumerate(_CATEGORY_KEYWORDS) if kw.isalnum()}
+    _TOKEN_SPLIT_RE = re.compile(r'[^a-z0-9]+')
+    
     def __init__(self, json_file_path: str):
         """Initialize with GTM container JSON data"""
         with open(json_file_path, 'r') as f:
             self.data = json.load(f)
         
-        self.graph = nx.DiGraph()
+        # Struct-of-arrays graph: parallel tag lists plus CSR tag -> variable edges
+        self._tag_names = []
+        self._tag_types = []
+        self._tag_templates = []
+        self._tag_type_map = {}
+        self._tag_type_counts = Counter()
+        self._var_names = []
+        self._var_index = {}
+        self._var_category = {}
+        self._edges_csr = None
         self.variable_usage = defaultdict(int)
         self.tag_complexity = {}
         self.build_graph()
     
     def build_graph(self):
-        """Build NetworkX graph from GTM data"""
-        # Add tag nodes
+        """Build tag/variable graph as parallel arrays with CSR edge storage"""
+        indptr = [0]
+        var_idx = []
+        weights = []
+        
+        # Names repeat across tags and every lookup dict; intern them once so
+        # duplicates share one object and dict probes hit the identity fast path
         for tag in self.data:
-            tag_name = tag['name']
-            self.graph.add_node(tag_name, 
-                               node_type='tag',
-                               tag_type=tag['type'],
-                               template=tag.get('custom_template_info', {}).get('name', 'None'))
+            tag_name = sys.intern(tag['name'])
+            all_variables = tag.get('all_variables', {})
+            self._tag_names.append(tag_name)
+            self._tag_types.append(sys.intern(tag['type']))
+            self._tag_templates.append((tag.get('custom_template_info') or {}).get('name', 'None'))
             
             # Track tag complexity
-            self.tag_complexity[tag_name] = len(tag.get('all_variables', {}))
+            self.tag_complexity[tag_name] = len(all_variables)
             
-            # Add variable nodes and edges
-            for var_name, usage_count in tag.get('all_variables', {}).items():
-                if not self.graph.has_node(var_name):
-                    self.graph.add_node(var_name, 
-                                      node_type='variable',
-                                      category=self._categorize_variable(var_name))
-                
-                # Add edge with usage count
-                self.graph.add_edge(tag_name, var_name, weight=usage_count)
+            # Register variables and record edges with usage count
+            for var_name, usage_count in all_variables.items():
+                var_name = sys.intern(var_name)
+                idx = self._var_index.get(var_name)
+                if idx is None:
+                    idx = self._var_index[var_name] = len(self._var_names)
+                    self._var_names.append(var_name)
+                    self._var_category[var_name] = self._categorize_variable(var_name)
+                var_idx.append(idx)
+                weights.append(usage_count)
                 self.variable_usage[var_name] += usage_count
+            indptr.append(len(var_idx))
+        
+        self._tag_type_map = dict(zip(self._tag_names, self._tag_types))
+        self._tag_type_counts = Counter(self._tag_types)
+        self._edges_csr = (np.asarray(indptr, dtype=np.int64),
+                           np.asarray(var_idx, dtype=np.int32),
+                           np.asarray(weights, dtype=np.int64))
+    
+    @cached_property
+    def graph(self) -> nx.DiGraph:
+        """NetworkX view of the tag/variable graph, built only on first access"""
+        graph = nx.DiGraph()
+        indptr, var_idx, weights = self._edges_csr
+        
+        for tag_name, tag_type, template in zip(self._tag_names, self._tag_types, self._tag_templates):
+            graph.add_node(tag_name, node_type='tag', tag_type=tag_type, template=template)
+        
+        for var_name in self._var_names:
+            graph.add_node(var_name, 
+                           node_type='variable',
+                           category=self._var_category[var_name])
+        
+        for t, tag_name in enumerate(self._tag_names):
+            for pos in range(indptr[t], indptr[t + 1]):
+                graph.add_edge(tag_name, self._var_names[var_idx[pos]], weight=int(weights[pos]))
+        
+        return graph
     
     def _categorize_variable(self, var_name: str) -> str:
         """Categorize variables based on naming patterns"""
         var_lower = var_name.lower()
         
-        categories = {
-            'session': 'Session',
-            'transaction': 'Ecommerce', 'purchase': 'Ecommerce', 'revenue': 'Ecommerce',
-            'item': 'Item',
-            'currency': 'Currency',
-            'firestore': 'Firestore',
-            'cookie': 'Cookie', '_fb': 'Cookie', '_ga': 'Cookie',
-            'page_': 'Page', 'hostname': 'Page',
-            'user': 'User', 'client_id': 'User',
-            'cd': 'Custom Dimension', 'dimension': 'Custom Dimension',
-            'cg': 'Custom Group',
-            'event': 'Event',
-            'campaign': 'Campaign',
-            'facebook': 'Facebook', 'fb ': 'Facebook',
-            'tiktok': 'TikTok', 'ttclid': 'TikTok', '_ttp': 'TikTok',
-            'bing': 'Bing', '_uet': 'Bing',
-            'meiro': 'Meiro',
-            'const': 'Constant', 'undefined': 'Constant',
-            'header': 'Header',
-            'domain': 'Domain',
-            'test': 'Test'
-        }
+        # A whole-token hit bounds the result; only higher-priority keywords,
+        # which may still occur as plain substrings, need scanning after it
+        best = len(self._CATEGORY_KEYWORDS)
+        for token in self._TOKEN_SPLIT_RE.split(var_lower):
+            priority = self._TOKEN_PRIORITY.get(token, best)
+            if priority < best:
+                best = priority
         
-        for keyword, category in categories.items():
+        for keyword, category in self._CATEGORY_KEYWORDS[:best]:
             if keyword in var_lower:
                 return category
+        if best < len(self._CATEGORY_KEYWORDS):
+            return self._CATEGORY_KEYWORDS[best][1]
         return 'Other'
     
     def get_network_stats(self):
         """Calculate network statistics"""
+        indptr, _, _ = self._edges_csr
+        tag_nodes = len(self._tag_names)
+        variable_nodes = len(self._var_names)
+        total_nodes = tag_nodes + variable_nodes
+        total_edges = int(indptr[-1])
+        
+        # Same definitions as nx.density() and mean DiGraph degree (in + out)
         stats = {
-            'total_nodes': self.graph.number_of_nodes(),
-            'total_edges': self.graph.number_of_edges(),
-            'tag_nodes': len([n for n, d in self.graph.nodes(data=True) if d['node_type'] == 'tag']),
-            'variable_nodes': len([n for n, d in self.graph.nodes(data=True) if d['node_type'] == 'variable']),
-            'density': nx.density(self.graph),
-            'avg_degree': sum(dict(self.graph.degree()).values()) / len(self.graph.nodes()),
+            'total_nodes': total_nodes,
+            'total_edges': total_edges,
+            'tag_nodes': tag_nodes,
+            'variable_nodes': variable_nodes,
+            'density': total_edges / (total_nodes * (total_nodes - 1)) if total_nodes > 1 else 0,
+            'avg_degree': 2 * total_edges / total_nodes,
         }
         
         return stats
     
+    def _top_variables_raw(self, top_n=20):
+        """Return the top_n (variable, usage count) tuples, most used first"""
+        return heapq.nlargest(top_n, self.variable_usage.items(), key=itemgetter(1))
+    
     def analyze_variable_usage(self, top_n=20):
         """Analyze most used variables"""
-        top_variables = sorted(self.variable_usage.items(), 
-                             key=lambda x: x[1], reverse=True)[:top_n]
-        
-        df = pd.DataFrame(top_variables, columns=['Variable', 'Usage Count'])
-        df['Category'] = df['Variable'].apply(self._categorize_variable)
+        df = pd.DataFrame(self._top_variables_raw(top_n), columns=['Variable', 'Usage Count'])
+        df['Category'] = df['Variable'].map(self._var_category)
         
         return df
     
@@ -103,137 +196,156 @@ class GTMGraphVisualizer:
         df = pd.DataFrame(top_complex, columns=['Tag', 'Variable Count'])
         
         # Add tag type information
-        tag_types = {}
-        for tag in self.data:
-            tag_types[tag['name']] = tag['type']
-        
-        df['Tag Type'] = df['Tag'].map(tag_types)
+        df['Tag Type'] = df['Tag'].map(self._tag_type_map)
         
         return df
     
+    def _var_tag_csr(self):
+        """Transpose the tag -> variable CSR into variable -> tags (tags ascending)"""
+        indptr, var_idx, _ = self._edges_csr
+        tag_of_edge = np.repeat(np.arange(len(self._tag_names), dtype=np.int32), np.diff(indptr))
+        var_tags = tag_of_edge[np.argsort(var_idx, kind='stable')]
+        var_indptr = np.zeros(len(self._var_names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(var_idx, minlength=len(self._var_names)), out=var_indptr[1:])
+        return var_indptr, var_tags
+    
+    def _shared_tag_pairs(self, min_shared):
+        """Return (tag1, tag2, count) arrays for tag pairs sharing >= min_shared variables"""
+        indptr, var_idx, _ = self._edges_csr
+        n_tags = len(self._tag_names)
+        min_shared = max(min_shared, 1)
+        
+        if njit is not None:
+            var_indptr, var_tags = self._var_tag_csr()
+            counts = _shared_variable_counts(indptr, var_idx, var_indptr, var_tags, n_tags)
+            pairs = np.argwhere(counts >= min_shared)
+            return pairs[:, 0], pairs[:, 1], counts[pairs[:, 0], pairs[:, 1]]
+        
+        # A[t, v] = 1 iff tag t uses variable v, so (A @ A.T)[i, j] = |vars(i) & vars(j)|
+        adjacency = sparse.csr_matrix(
+            (np.ones(len(var_idx), dtype=np.int32), var_idx, indptr),
+            shape=(n_tags, len(self._var_names))
+        )
+        shared = (adjacency @ adjacency.T).tocoo()
+        keep = (shared.row < shared.col) & (shared.data >= min_shared)
+        tag1, tag2, counts = shared.row[keep], shared.col[keep], shared.data[keep]
+        order = np.lexsort((tag2, tag1))
+        return tag1[order], tag2[order], counts[order]
+    
     def find_shared_variables(self, min_shared=5):
         """Find tags that share many variables"""
         shared_vars = []
+        indptr, var_idx, _ = self._edges_csr
         
-        tag_vars = {}
-        for tag in self.data:
-            tag_vars[tag['name']] = set(tag.get('all_variables', {}).keys())
-        
-        tag_names = list(tag_vars.keys())
-        for i, tag1 in enumerate(tag_names):
-            for tag2 in tag_names[i+1:]:
-                shared = tag_vars[tag1] & tag_vars[tag2]
-                if len(shared) >= min_shared:
-                    shared_vars.append({
-                        'Tag 1': tag1,
-                        'Tag 2': tag2,
-                        'Shared Variables': len(shared),
-                        'Variables': list(shared)[:5]  # Show first 5
-                    })
+        # Only surviving pairs pay for recovering their example variable names
+        for t1, t2, count in zip(*(arr.tolist() for arr in self._shared_tag_pairs(min_shared))):
+            vars2 = set(var_idx[indptr[t2]:indptr[t2 + 1]].tolist())
+            shared = [self._var_names[v] for v in var_idx[indptr[t1]:indptr[t1 + 1]].tolist() if v in vars2]
+            shared_vars.append({
+                'Tag 1': self._tag_names[t1],
+                'Tag 2': self._tag_names[t2],
+                'Shared Variables': count,
+                'Variables': shared[:5]  # Show first 5
+            })
         
         return sorted(shared_vars, key=lambda x: x['Shared Variables'], reverse=True)
     
     def analyze_categories(self):
         """Analyze variable categories"""
-        categories = defaultdict(list)
-        
-        for var_name, usage in self.variable_usage.items():
-            category = self._categorize_variable(var_name)
-            categories[category].append(usage)
-        
-        category_stats = {}
-        for category, usages in categories.items():
-            category_stats[category] = {
-                'count': len(usages),
-                'total_usage': sum(usages),
-                'avg_usage': sum(usages) / len(usages),
-                'max_usage': max(usages)
-            }
-        
-        df = pd.DataFrame.from_dict(category_stats, orient='index')
+        usage = pd.DataFrame({
+            'category': [self._var_category[name] for name in self.variable_usage],
+            'usage': list(self.variable_usage.values()),
+        })
+        
+        df = usage.groupby('category', sort=False)['usage'].agg(
+            count='count', total_usage='sum', avg_usage='mean', max_usage='max'
+        ).rename_axis(None)
         return df.sort_values('total_usage', ascending=False)
     
-    def create_summary_report(self):
+    def create_summary_report(self, out=sys.stdout):
         """Create a comprehensive summary report"""
-        print("=" * 60)
-        print("GTM CONTAINER DEPENDENCY ANALYSIS REPORT")
-        print("=" * 60)
+        lines = [
+            "=" * 60,
+            "GTM CONTAINER DEPENDENCY ANALYSIS REPORT",
+            "=" * 60,
+        ]
         
         # Network Statistics
         stats = self.get_network_stats()
-        print(f"\nNETWORK OVERVIEW:")
-        print(f"  Total Nodes: {stats['total_nodes']}")
-        print(f"  Total Edges: {stats['total_edges']}")
-        print(f"  Tags: {stats['tag_nodes']}")
-        print(f"  Variables: {stats['variable_nodes']}")
-        print(f"  Network Density: {stats['density']:.4f}")
-        print(f"  Average Degree: {stats['avg_degree']:.2f}")
+        lines.append(f"\nNETWORK OVERVIEW:")
+        lines.append(f"  Total Nodes: {stats['total_nodes']}")
+        lines.append(f"  Total Edges: {stats['total_edges']}")
+        lines.append(f"  Tags: {stats['tag_nodes']}")
+        lines.append(f"  Variables: {stats['variable_nodes']}")
+        lines.append(f"  Network Density: {stats['density']:.4f}")
+        lines.append(f"  Average Degree: {stats['avg_degree']:.2f}")
         
         # Top Variables
-        print(f"\nTOP 10 MOST USED VARIABLES:")
-        top_vars = self.analyze_variable_usage(10)
-        for _, row in top_vars.iterrows():
-            print(f"  {row['Variable'][:50]}... ({row['Category']}): {row['Usage Count']}")
+        lines.append(f"\nTOP 10 MOST USED VARIABLES:")
+        for variable, usage_count in self._top_variables_raw(10):
+            lines.append(f"  {variable[:50]}... ({self._var_category[variable]}): {usage_count}")
         
         # Most Complex Tags
-        print(f"\nMOST COMPLEX TAGS (by variable count):")
+        lines.append(f"\nMOST COMPLEX TAGS (by variable count):")
         complex_tags = self.analyze_tag_complexity(10)
-        for _, row in complex_tags.iterrows():
-            print(f"  {row['Tag'][:50]}... ({row['Tag Type']}): {row['Variable Count']} vars")
+        for tag, variable_count, tag_type in complex_tags.itertuples(index=False):
+            lines.append(f"  {tag[:50]}... ({tag_type}): {variable_count} vars")
         
         # Category Analysis
-        print(f"\nVARIABLE CATEGORIES:")
-        categories = self.analyze_categories()
-        for category, stats in categories.head(10).iterrows():
-            print(f"  {category}: {stats['count']} vars, {stats['total_usage']} total usage")
+        lines.append(f"\nVARIABLE CATEGORIES:")
+        categories = self.analyze_categories().head(10)
+        for category, count, total_usage in zip(categories.index, categories['count'], categories['total_usage']):
+            lines.append(f"  {category}: {count} vars, {total_usage} total usage")
         
         # Shared Variables
-        print(f"\nTAGS WITH MANY SHARED VARIABLES:")
+        lines.append(f"\nTAGS WITH MANY SHARED VARIABLES:")
         shared = self.find_shared_variables(5)
         for item in shared[:5]:
             tag1 = item['Tag 1'][:30] + "..." if len(item['Tag 1']) > 30 else item['Tag 1']
             tag2 = item['Tag 2'][:30] + "..." if len(item['Tag 2']) > 30 else item['Tag 2']
-            print(f"  {tag1} <-> {tag2}: {item['Shared Variables']} shared")
+            lines.append(f"  {tag1} <-> {tag2}: {item['Shared Variables']} shared")
+        
+        lines.append("\n" + "=" * 60)
         
-        print("\n" + "=" * 60)
+        # Emit the whole report with a single write
+        out.write('\n'.join(lines) + '\n')
     
     def create_visualizations(self):
         """Create visualization plots"""
         plt.style.use('default')
-        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        fig, axes = plt.subplots(2, 2, figsize=(15, 12), constrained_layout=True)
         
         # 1. Variable Usage Distribution
         top_vars = self.analyze_variable_usage(15)
-        axes[0,0].barh(range(len(top_vars)), top_vars['Usage Count'])
-        axes[0,0].set_yticks(range(len(top_vars)))
-        axes[0,0].set_yticklabels([v[:30] + '...' if len(v) > 30 else v 
-                                  for v in top_vars['Variable']], fontsize=8)
+        names = top_vars['Variable']
+        labels = names.str.slice(0, 30).where(names.str.len() <= 30, names.str.slice(0, 30) + '...')
+        axes[0,0].barh(np.arange(len(top_vars)), top_vars['Usage Count'], tick_label=labels)
+        axes[0,0].tick_params(axis='y', labelsize=8)
         axes[0,0].set_xlabel('Usage Count')
         axes[0,0].set_title('Top 15 Most Used Variables')
         axes[0,0].invert_yaxis()
         
         # 2. Tag Complexity Distribution
-        complexities = list(self.tag_complexity.values())
+        complexities = np.fromiter(self.tag_complexity.values(), dtype=np.int32,
+                                   count=len(self.tag_complexity))
         axes[0,1].hist(complexities, bins=20, alpha=0.7, color='skyblue')
         axes[0,1].set_xlabel('Number of Variables')
         axes[0,1].set_ylabel('Number of Tags')
         axes[0,1].set_title('Tag Complexity Distribution')
         
         # 3. Category Analysis
-        categories = self.analyze_categories()
-        axes[1,0].bar(range(len(categories.head(10))), categories.head(10)['total_usage'])
-        axes[1,0].set_xticks(range(len(categories.head(10))))
-        axes[1,0].set_xticklabels(categories.head(10).index, rotation=45, ha='right')
+        top_categories = self.analyze_categories().head(10)
+        axes[1,0].bar(np.arange(len(top_categories)), top_categories['total_usage'],
+                      tick_label=top_categories.index)
+        plt.setp(axes[1,0].get_xticklabels(), rotation=45, ha='right')
         axes[1,0].set_ylabel('Total Usage')
         axes[1,0].set_title('Variable Categories by Usage')
         
         # 4. Tag Type Distribution
-        tag_types = [tag['type'] for tag in self.data]
-        type_counts = Counter(tag_types)
+        type_counts = self._tag_type_counts
         axes[1,1].pie(type_counts.values(), labels=type_counts.keys(), autopct='%1.1f%%')
         axes[1,1].set_title('Tag Type Distribution')
         
-        plt.tight_layout()
         plt.show()
         
         return fig
@@ -251,22 +363,23 @@ def analyze_gtm_container(json_file_path: str):
     visualizer.create_visualizations()
     
     # Export detailed data
-    print("\nDetailed Analysis Data:")
-    print("\n1. Variable Usage Analysis:")
+    lines = ["\nDetailed Analysis Data:", "\n1. Variable Usage Analysis:"]
     var_analysis = visualizer.analyze_variable_usage(20)
-    print(var_analysis)
+    lines.append(var_analysis.to_string())
     
-    print("\n2. Tag Complexity Analysis:")
+    lines.append("\n2. Tag Complexity Analysis:")
     complexity_analysis = visualizer.analyze_tag_complexity(15)
-    print(complexity_analysis)
+    lines.append(complexity_analysis.to_string())
     
-    print("\n3. Shared Variables Analysis:")
+    lines.append("\n3. Shared Variables Analysis:")
     shared_analysis = visualizer.find_shared_variables(3)
     for item in shared_analysis[:10]:
-        print(f"Tags: {item['Tag 1']} <-> {item['Tag 2']}")
-        print(f"Shared: {item['Shared Variables']} variables")
-        print(f"Examples: {', '.join(item['Variables'])}")
-        print("-" * 50)
+        lines.append(f"Tags: {item['Tag 1']} <-> {item['Tag 2']}")
+        lines.append(f"Shared: {item['Shared Variables']} variables")
+        lines.append(f"Examples: {', '.join(item['Variables'])}")
+        lines.append("-" * 50)
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
     
     return visualizer
 
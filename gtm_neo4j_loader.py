@@ -4,73 +4,178 @@ Neo4j Loader for GTM Analysis Dataset (output2.json format)
 Loads nodes and relationships from the standardized dataset
 """
 
+import csv
 import json
+import re
 import sys
 import os
+import subprocess
 from neo4j import GraphDatabase
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable
+from itertools import islice
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import argparse
+import queue
+import threading
 from datetime import datetime
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _quote_name(name: str) -> str:
+    """Backtick-quote a label or relationship type for interpolation into Cypher"""
+    # Labels and types cannot be parameters; doubling backticks is Cypher's escape
+    return "`" + name.replace("`", "``") + "`"
+
+def _prefetch(items: Iterable, depth: int = 4):
+    """Iterate items on a background thread, keeping up to depth of them ready.
+    
+    Lets JSON parsing and batch building run while the caller is writing; the
+    bounded queue stops the producer from running ahead of the writes.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    
+    def produce():
+        try:
+            for item in items:
+                buffer.put(('item', item))
+        except Exception as e:
+            buffer.put(('error', e))
+        else:
+            buffer.put(('done', None))
+    
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        kind, value = buffer.get()
+        if kind == 'done':
+            return
+        if kind == 'error':
+            raise value
+        yield value
+
 class GTMContainerGraphLoader:
-    def __init__(self, uri: str, user: str, password: str):
+    # Naming rules checked in order; the first rule with a matching keyword wins
+    _CATEGORY_RULES = (
+        ('Session', ('session',)),
+        ('Ecommerce', ('transaction', 'purchase', 'revenue')),
+        ('Item', ('item',)),
+        ('Currency', ('currency',)),
+        ('Firestore', ('firestore',)),
+        ('Cookie', ('cookie', '_fb', '_ga')),
+        ('Page', ('page_', 'hostname')),
+        ('User', ('user', 'client_id')),
+        ('Custom Dimension', ('cd', 'dimension')),
+        ('Custom Group', ('cg',)),
+        ('Event', ('event',)),
+        ('Campaign', ('campaign',)),
+        ('Facebook', ('fb', 'facebook')),
+        ('TikTok', ('tiktok', 'ttclid', '_ttp')),
+        ('Bing', ('bing', '_uet')),
+        ('Meiro', ('meiro',)),
+        ('Constant', ('const', 'undefined')),
+        ('Header', ('header',)),
+        ('Domain', ('domain',)),
+        ('Test', ('test',)),
+    )
+    _CATEGORY_NAMES = tuple(name for name, _ in _CATEGORY_RULES)
+    # One lookahead branch per rule, each with an empty group so lastindex names
+    # the rule. Branches are tried in order from the start of the string, so rule
+    # order decides the category, not where in the name a keyword appears.
+    _CATEGORY_PATTERN = re.compile(
+        r'\A(?:' + '|'.join(
+            f"(?=.*?(?:{'|'.join(map(re.escape, keywords))}))()"
+            for _, keywords in _CATEGORY_RULES
+        ) + ')',
+        re.DOTALL,
+    )
+    
+    def __init__(self, uri: str, user: str, password: str, database: str = 'neo4j',
+                 workers: int = 8):
         """Initialize Neo4j connection"""
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        # Naming the database up front skips the home-database lookup per session
+        self.db_name = database
+        # Bulk loads fan batches out over this many threads; the driver is
+        # thread-safe and each worker takes its own session from the pool
+        self.workers = workers
+        # Background pool for read queries, created on first submit_query
+        self._query_pool = None
     
     def close(self):
         """Close the database connection"""
+        # Let queued read queries finish before the driver goes away
+        if self._query_pool is not None:
+            self._query_pool.shutdown(wait=True)
+            self._query_pool = None
         self.driver.close()
     
     def clear_database(self):
         """Clear all existing data"""
-        with self.driver.session() as session:
+        with self.driver.session(database=self.db_name) as session:
             session.run("MATCH (n) DETACH DELETE n")
             print("Database cleared successfully")
     
     def create_constraints_and_indexes(self):
         """Create constraints and indexes for better performance"""
-        with self.driver.session() as session:
-            # Constraints for unique IDs
-            constraints = [
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Variable) REQUIRE n.id IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Tag) REQUIRE n.id IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Trigger) REQUIRE n.id IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Client) REQUIRE n.id IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Transformation) REQUIRE n.id IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (n:CustomTemplate) REQUIRE n.id IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Container) REQUIRE n.id IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (n:DuplicateGroup) REQUIRE n.id IS UNIQUE"
-            ]
-            
-            # Indexes for common queries
-            indexes = [
-                "CREATE INDEX IF NOT EXISTS FOR (n:Variable) ON (n.name)",
-                "CREATE INDEX IF NOT EXISTS FOR (n:Variable) ON (n.type)",
-                "CREATE INDEX IF NOT EXISTS FOR (n:Variable) ON (n.is_used)",
-                "CREATE INDEX IF NOT EXISTS FOR (n:Tag) ON (n.name)",
-                "CREATE INDEX IF NOT EXISTS FOR (n:Trigger) ON (n.name)",
-                "CREATE INDEX IF NOT EXISTS FOR (n:Client) ON (n.name)",
-                "CREATE INDEX IF NOT EXISTS FOR (n:Transformation) ON (n.name)",
-                "CREATE INDEX IF NOT EXISTS FOR (n:CustomTemplate) ON (n.name)"
-            ]
-            
-            # Create constraints
-            for constraint in constraints:
-                try:
-                    session.run(constraint)
-                except Exception as e:
-                    if "already exists" not in str(e).lower():
-                        print(f"Note: {e}")
-            
-            # Create indexes
-            for index in indexes:
+        self._create_minimum_indexes()
+        self._create_secondary_indexes()
+    
+    def _create_minimum_indexes(self):
+        """Create the only constraint the load itself needs, the shared Node id"""
+        # Relationship loading matches endpoints by Node.id, so this one has to
+        # exist up front; everything else is cheaper to build once the data is in
+        self._run_schema([
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Node) REQUIRE n.id IS UNIQUE"
+        ])
+        print("✓ Created Node id constraint")
+    
+    def _create_secondary_indexes(self):
+        """Create per-label constraints and lookup indexes after a bulk load"""
+        # Constraints for unique IDs
+        constraints = [
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Variable) REQUIRE n.id IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Tag) REQUIRE n.id IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Trigger) REQUIRE n.id IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Client) REQUIRE n.id IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Transformation) REQUIRE n.id IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (n:CustomTemplate) REQUIRE n.id IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Container) REQUIRE n.id IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (n:DuplicateGroup) REQUIRE n.id IS UNIQUE"
+        ]
+        
+        # Indexes for common queries
+        indexes = [
+            "CREATE INDEX IF NOT EXISTS FOR (n:Variable) ON (n.name)",
+            "CREATE INDEX IF NOT EXISTS FOR (n:Variable) ON (n.type)",
+            "CREATE INDEX IF NOT EXISTS FOR (n:Variable) ON (n.is_used)",
+            "CREATE INDEX IF NOT EXISTS FOR (n:Variable) ON (n.category)",
+            "CREATE INDEX IF NOT EXISTS FOR (n:Tag) ON (n.name)",
+            "CREATE INDEX IF NOT EXISTS FOR (n:Trigger) ON (n.name)",
+            "CREATE INDEX IF NOT EXISTS FOR (n:Client) ON (n.name)",
+            "CREATE INDEX IF NOT EXISTS FOR (n:Transformation) ON (n.name)",
+            "CREATE INDEX IF NOT EXISTS FOR (n:CustomTemplate) ON (n.name)"
+        ]
+        
+        self._run_schema(constraints + indexes)
+        print("✓ Created constraints and indexes")
+    
+    def _run_schema(self, statements: List[str]):
+        """Run schema statements, reporting anything other than already-exists errors"""
+        with self.driver.session(database=self.db_name) as session:
+            for statement in statements:
                 try:
-                    session.run(index)
+                    session.run(statement)
                 except Exception as e:
                     if "already exists" not in str(e).lower():
                         print(f"Note: {e}")
-            
-            print("✓ Created constraints and indexes")
     
     def load_dataset(self, dataset: Dict[str, Any], clear_existing: bool = False):
         """Load the output2.json format dataset into Neo4j"""
@@ -79,304 +184,270 @@ class GTMContainerGraphLoader:
             print("Clearing existing data...")
             self.clear_database()
         
-        print("Creating constraints and indexes...")
-        self.create_constraints_and_indexes()
+        # Secondary indexes are built after the load instead of maintained per insert
+        print("Creating Node id constraint...")
+        self._create_minimum_indexes()
         
         # Load nodes and relationships
         nodes = dataset.get('nodes', [])
         relationships = dataset.get('relationships', [])
         
-        print(f"\nLoading {len(nodes)} nodes...")
-        self._load_nodes(nodes)
-        
-        print(f"\nLoading {len(relationships)} relationships...")
-        self._load_relationships(relationships)
+        with self.driver.session(database=self.db_name) as session:
+            # Inputs may be streamed, so counts are only known once loaded
+            print("\nLoading nodes...")
+            self._load_nodes(nodes, session=session)
+            
+            print("\nLoading relationships...")
+            self._load_relationships(relationships, session=session)
+            
+            print("\n✓ Dataset loaded successfully!")
         
-        print("\n✓ Dataset loaded successfully!")
+        print("\nCreating constraints and indexes...")
+        self._create_secondary_indexes()
         
         # Run validation
         self._validate_import()
     
-    def _load_nodes(self, nodes: List[Dict[str, Any]], batch_size: int = 100):
-        """Load nodes in batches"""
-        with self.driver.session() as session:
-            for i in range(0, len(nodes), batch_size):
-                batch = nodes[i:i + batch_size]
-                
-                # Process each node in the batch
-                for node_data in batch:
-                    node_id = node_data['id']
-                    labels = ':'.join(node_data['labels'])
-                    properties = node_data['properties']
-                    
-                    # Build property string
-                    prop_strings = []
-                    for key, value in properties.items():
-                        if isinstance(value, str):
-                            # Escape single quotes in strings
-                            value = value.replace("'", "\\'")
-                            prop_strings.append(f"{key}: '{value}'")
-                        elif isinstance(value, bool):
-                            prop_strings.append(f"{key}: {str(value).lower()}")
-                        elif value is None:
-                            prop_strings.append(f"{key}: null")
-                        else:
-                            prop_strings.append(f"{key}: {value}")
-                    
-                    prop_string = '{' + ', '.join(prop_strings) + '}'
-                    
-                    # Create node with all labels
-                    query = f"CREATE (n:{labels} {prop_string})"
-                    
-                    try:
-                        session.run(query)
-                    except Exception as e:
-                        print(f"Error creating node {node_id}: {e}")
-                
-                print(f"  Loaded {min(i + batch_size, len(nodes))}/{len(nodes)} nodes...", end='\r')
+    def _run_batched(self, query: str, rows: List[Dict[str, Any]], batch_size: int = 10_000,
+                     session=None) -> int:
+        """Run an UNWIND $rows query in slices, one explicit transaction per slice.
+        
+        Reuses the given session when provided, otherwise opens its own.
+        Returns the number of nodes and relationships created.
+        """
+        if session is None:
+            with self.driver.session(database=self.db_name) as own_session:
+                return self._run_batched(query, rows, batch_size, own_session)
+        
+        created = 0
+        for i in range(0, len(rows), batch_size):
+            with session.begin_transaction() as tx:
+                counters = tx.run(query, rows=rows[i:i + batch_size]).consume().counters
+                tx.commit()
+            created += counters.nodes_created + counters.relationships_created
+        return created
+    
+    def _run_batch(self, query: str, rows: List[Dict[str, Any]]) -> int:
+        """Run one UNWIND $rows batch on its own session in a managed write transaction.
+        
+        Managed transactions are retried on transient errors, which covers the
+        deadlocks concurrent relationship writes can hit on shared nodes.
+        """
+        with self.driver.session(database=self.db_name) as session:
+            counters = session.execute_write(lambda tx: tx.run(query, rows=rows).consume().counters)
+        return counters.nodes_created + counters.relationships_created
+    
+    def _run_parallel(self, jobs: Iterable[tuple], session=None) -> int:
+        """Run (description, query, rows) jobs across the worker pool.
+        
+        At most two batches per worker are in flight, so streamed input is not
+        pulled in faster than it is written. With a single worker the jobs run
+        in order on the given session instead.
+        """
+        created = 0
+        if self.workers <= 1:
+            for description, query, rows in jobs:
+                try:
+                    created += self._run_batched(query, rows, session=session)
+                except Exception as e:
+                    print(f"Error creating {description}: {e}")
+            return created
+        
+        pending = {}
+        
+        def collect(done):
+            nonlocal created
+            for future in done:
+                description = pending.pop(future)
+                try:
+                    created += future.result()
+                except Exception as e:
+                    print(f"Error creating {description}: {e}")
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for description, query, rows in jobs:
+                if len(pending) >= 2 * self.workers:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                pending[executor.submit(self._run_batch, query, rows)] = description
+            collect(wait(pending).done)
+        
+        return created
+    
+    def _load_nodes(self, nodes: Iterable[Dict[str, Any]], batch_size: int = 10_000, session=None):
+        """Load nodes in batches, one parameterized UNWIND per label combination"""
+        loaded = self._run_parallel(_prefetch(self._node_batches(nodes, batch_size)), session)
+        print(f"  Loaded {loaded} nodes")
+        return loaded
+    
+    def _node_batches(self, nodes: Iterable[Dict[str, Any]], batch_size: int):
+        """Yield node load jobs, grouping each streamed slice by label combination"""
+        nodes = iter(nodes)
+        for batch in iter(lambda: list(islice(nodes, batch_size)), []):
+            nodes_by_labels = defaultdict(list)
+            for node_data in batch:
+                nodes_by_labels[tuple(node_data['labels'])].append(
+                    {'id': node_data['id'], 'props': node_data['properties']}
+                )
             
-            print()  # New line after progress
+            for labels, rows in nodes_by_labels.items():
+                label_string = ':'.join(map(_quote_name, labels))
+                query = f"UNWIND $rows AS row CREATE (n:Node:{label_string}) SET n = row.props, n.id = row.id"
+                yield f"{':'.join(labels)} nodes", query, rows
     
-    def _load_relationships(self, relationships: List[Dict[str, Any]], batch_size: int = 100):
+    def _load_relationships(self, relationships: Iterable[Dict[str, Any]], batch_size: int = 10_000,
+                            session=None):
         """Load relationships in batches"""
-        with self.driver.session() as session:
+        total_created = self._run_parallel(
+            _prefetch(self._relationship_batches(relationships, batch_size)), session
+        )
+        print(f"  Created {total_created} relationships")
+        return total_created
+    
+    def _relationship_batches(self, relationships: Iterable[Dict[str, Any]], batch_size: int):
+        """Yield relationship load jobs, grouping each streamed slice by type"""
+        relationships = iter(relationships)
+        for batch in iter(lambda: list(islice(relationships, batch_size)), []):
             # Group by relationship type for efficiency
-            rels_by_type = {}
-            for rel in relationships:
-                rel_type = rel['type']
-                if rel_type not in rels_by_type:
-                    rels_by_type[rel_type] = []
-                rels_by_type[rel_type].append(rel)
+            rels_by_type = defaultdict(list)
+            for rel in batch:
+                rels_by_type[rel['type']].append(rel)
             
-            total_created = 0
             for rel_type, rels in rels_by_type.items():
-                print(f"  Loading {rel_type} relationships...")
-                
-                for i in range(0, len(rels), batch_size):
-                    batch = rels[i:i + batch_size]
-                    
-                    for rel_data in batch:
-                        start_id = rel_data['startNode']
-                        end_id = rel_data['endNode']
-                        properties = rel_data.get('properties', {})
-                        
-                        # Build property string
-                        if properties:
-                            prop_strings = []
-                            for key, value in properties.items():
-                                if isinstance(value, str):
-                                    value = value.replace("'", "\\'")
-                                    prop_strings.append(f"{key}: '{value}'")
-                                else:
-                                    prop_strings.append(f"{key}: {value}")
-                            prop_string = '{' + ', '.join(prop_strings) + '}'
-                        else:
-                            prop_string = ''
-                        
-                        # Create relationship
-                        query = f"""
-                        MATCH (a {{id: '{start_id}'}}), (b {{id: '{end_id}'}})
-                        CREATE (a)-[:{rel_type} {prop_string}]->(b)
-                        """
-                        
-                        try:
-                            session.run(query)
-                            total_created += 1
-                        except Exception as e:
-                            print(f"Error creating relationship {start_id} -> {end_id}: {e}")
-                
-            print(f"  Created {total_created} relationships")
+                query = f"""
+                UNWIND $rows AS r
+                MATCH (a:Node {{id: r.s}}), (b:Node {{id: r.e}})
+                CREATE (a)-[x:{_quote_name(rel_type)}]->(b)
+                SET x = r.props
+                """
+                rows = [
+                    {'s': rel_data['startNode'], 'e': rel_data['endNode'],
+                     'props': rel_data.get('properties', {})}
+                    for rel_data in rels
+                ]
+                yield f"{rel_type} relationships", query, rows
     
     def _validate_import(self):
         """Validate the import by running some checks"""
-        with self.driver.session() as session:
-            print("\nValidation Results:")
-            
-            # Count nodes by label
-            query = """
-            MATCH (n)
-            UNWIND labels(n) AS label
-            WITH label, count(DISTINCT n) as count
-            RETURN label, count
-            ORDER BY count DESC
-            """
-            result = session.run(query)
-            print("\nNode counts by label:")
-            for record in result:
-                print(f"  - {record['label']}: {record['count']}")
-            
-            # Count relationships
-            query = """
-            MATCH ()-[r]->()
-            RETURN type(r) as type, count(r) as count
-            ORDER BY count DESC
-            """
-            result = session.run(query)
-            print("\nRelationship counts:")
-            for record in result:
-                print(f"  - {record['type']}: {record['count']}")
+        # Both counts are submitted together so they run side by side
+        node_counts = self.submit_query("""
+        MATCH (n)
+        UNWIND labels(n) AS label
+        RETURN label, count(n) as count
+        ORDER BY count DESC
+        """)
+        rel_counts = self.submit_query("""
+        MATCH ()-[r]->()
+        RETURN type(r) as type, count(r) as count
+        ORDER BY count DESC
+        """)
+        
+        print("\nValidation Results:")
+        
+        # Count nodes by label
+        print("\nNode counts by label:")
+        for record in node_counts.result():
+            print(f"  - {record['label']}: {record['count']}")
+        
+        # Count relationships
+        print("\nRelationship counts:")
+        for record in rel_counts.result():
+            print(f"  - {record['type']}: {record['count']}")
     
     def _categorize_variable(self, var_name: str) -> str:
         """Categorize variables based on naming patterns"""
-        var_lower = var_name.lower()
-        
-        if 'session' in var_lower:
-            return 'Session'
-        elif 'transaction' in var_lower or 'purchase' in var_lower or 'revenue' in var_lower:
-            return 'Ecommerce'
-        elif 'item' in var_lower:
-            return 'Item'
-        elif 'currency' in var_lower:
-            return 'Currency'
-        elif 'firestore' in var_lower:
-            return 'Firestore'
-        elif 'cookie' in var_lower or '_fb' in var_lower or '_ga' in var_lower:
-            return 'Cookie'
-        elif 'page_' in var_lower or 'hostname' in var_lower:
-            return 'Page'
-        elif 'user' in var_lower or 'client_id' in var_lower:
-            return 'User'
-        elif 'cd' in var_lower or 'dimension' in var_lower:
-            return 'Custom Dimension'
-        elif 'cg' in var_lower:
-            return 'Custom Group'
-        elif 'event' in var_lower:
-            return 'Event'
-        elif 'campaign' in var_lower:
-            return 'Campaign'
-        elif 'fb' in var_lower or 'facebook' in var_lower:
-            return 'Facebook'
-        elif 'tiktok' in var_lower or 'ttclid' in var_lower or '_ttp' in var_lower:
-            return 'TikTok'
-        elif 'bing' in var_lower or '_uet' in var_lower:
-            return 'Bing'
-        elif 'meiro' in var_lower:
-            return 'Meiro'
-        elif 'const' in var_lower or 'undefined' in var_lower:
-            return 'Constant'
-        elif 'header' in var_lower:
-            return 'Header'
-        elif 'domain' in var_lower:
-            return 'Domain'
-        elif 'test' in var_lower:
-            return 'Test'
-        else:
-            return 'Other'
+        m = self._CATEGORY_PATTERN.match(var_name.lower())
+        return self._CATEGORY_NAMES[m.lastindex - 1] if m else 'Other'
     
     def _create_tag_nodes(self, json_data: List[Dict[str, Any]]):
         """Create tag nodes"""
-        with self.driver.session() as session:
-            for tag in json_data:
-                query = """
-                CREATE (t:Tag {
-                    name: $name,
-                    type: $type,
-                    template_name: $template_name,
-                    template_id: $template_id,
-                    direct_variable_count: $direct_count,
-                    total_variable_count: $total_count
-                })
-                """
-                
-                template_info = tag.get('custom_template_info', {}) or {}
-                
-                session.run(query, 
-                    name=tag['name'],
-                    type=tag['type'],
-                    template_name=template_info.get('name'),
-                    template_id=template_info.get('template_id'),
-                    direct_count=len(tag.get('direct_variables', [])),
-                    total_count=len(tag.get('all_variables', {}))
-                )
-            print(f"Created {len(json_data)} tag nodes")
+        query = """
+        UNWIND $rows AS r
+        CREATE (t:Tag {
+            name: r.name,
+            type: r.type,
+            template_name: r.template_name,
+            template_id: r.template_id,
+            direct_variable_count: r.direct_count,
+            total_variable_count: r.total_count
+        })
+        """
+        rows = []
+        for tag in json_data:
+            template_info = tag.get('custom_template_info', {}) or {}
+            rows.append({
+                'name': tag['name'],
+                'type': tag['type'],
+                'template_name': template_info.get('name'),
+                'template_id': template_info.get('template_id'),
+                'direct_count': len(tag.get('direct_variables', [])),
+                'total_count': len(tag.get('all_variables', {}))
+            })
+        
+        self._run_batched(query, rows)
+        print(f"Created {len(json_data)} tag nodes")
     
     def _create_variable_nodes(self, variables: set, categories: dict):
         """Create variable nodes"""
-        with self.driver.session() as session:
-            for var_name in variables:
-                query = """
-                CREATE (v:Variable {
-                    name: $name,
-                    category: $category
-                })
-                """
-                session.run(query, 
-                    name=var_name,
-                    category=categories.get(var_name, 'Other')
-                )
-            print(f"Created {len(variables)} variable nodes")
+        query = "UNWIND $rows AS r CREATE (v:Variable {name: r.name, category: r.category})"
+        rows = [{'name': var_name, 'category': categories.get(var_name, 'Other')} for var_name in variables]
+        self._run_batched(query, rows)
+        print(f"Created {len(variables)} variable nodes")
     
     def _create_category_nodes(self, categories: set):
         """Create category nodes"""
-        with self.driver.session() as session:
-            for category in categories:
-                query = "CREATE (c:Category {name: $name})"
-                session.run(query, name=category)
-            print(f"Created {len(categories)} category nodes")
+        self._run_batched("UNWIND $rows AS r CREATE (c:Category {name: r.name})",
+                          [{'name': category} for category in categories])
+        print(f"Created {len(categories)} category nodes")
     
     def _create_template_nodes(self, json_data: List[Dict[str, Any]]):
         """Create template nodes"""
-        templates = set()
-        with self.driver.session() as session:
-            for tag in json_data:
-                template_info = tag.get('custom_template_info')
-                if template_info:
-                    template_key = (template_info['name'], template_info['template_id'])
-                    if template_key not in templates:
-                        templates.add(template_key)
-                        query = """
-                        CREATE (template:Template {
-                            name: $name,
-                            id: $id
-                        })
-                        """
-                        session.run(query, 
-                            name=template_info['name'],
-                            id=template_info['template_id']
-                        )
-            print(f"Created {len(templates)} template nodes")
+        templates = {
+            (tag['custom_template_info']['name'], tag['custom_template_info']['template_id'])
+            for tag in json_data if tag.get('custom_template_info')
+        }
+        rows = [{'name': name, 'id': template_id} for name, template_id in templates]
+        
+        self._run_batched("UNWIND $rows AS r CREATE (template:Template {name: r.name, id: r.id})", rows)
+        print(f"Created {len(templates)} template nodes")
     
     def _create_tag_type_nodes(self, json_data: List[Dict[str, Any]]):
         """Create tag type nodes"""
         tag_types = set(tag['type'] for tag in json_data)
-        with self.driver.session() as session:
-            for tag_type in tag_types:
-                query = "CREATE (tt:TagType {name: $name})"
-                session.run(query, name=tag_type)
-            print(f"Created {len(tag_types)} tag type nodes")
+        self._run_batched("UNWIND $rows AS r CREATE (tt:TagType {name: r.name})",
+                          [{'name': tag_type} for tag_type in tag_types])
+        print(f"Created {len(tag_types)} tag type nodes")
     
     def _create_tag_variable_relationships(self, json_data: List[Dict[str, Any]]):
         """Create relationships between tags and variables"""
-        with self.driver.session() as session:
-            relationship_count = 0
+        direct_rows = []
+        uses_rows = []
+        for tag in json_data:
+            tag_name = tag['name']
+            
+            direct_variables = tag.get('direct_variables', [])
             
-            for tag in json_data:
-                tag_name = tag['name']
-                
-                # Direct variable relationships
-                for var_name in tag.get('direct_variables', []):
-                    query = """
-                    MATCH (t:Tag {name: $tag_name}), (v:Variable {name: $var_name})
-                    CREATE (t)-[:USES_DIRECTLY]->(v)
-                    """
-                    session.run(query, tag_name=tag_name, var_name=var_name)
-                    relationship_count += 1
-                
-                # All variable relationships with usage count
-                for var_name, usage_count in tag.get('all_variables', {}).items():
-                    if var_name not in tag.get('direct_variables', []):
-                        query = """
-                        MATCH (t:Tag {name: $tag_name}), (v:Variable {name: $var_name})
-                        CREATE (t)-[:USES {count: $usage_count}]->(v)
-                        """
-                        session.run(query, 
-                            tag_name=tag_name, 
-                            var_name=var_name, 
-                            usage_count=usage_count
-                        )
-                        relationship_count += 1
+            # Direct variable relationships
+            for var_name in direct_variables:
+                direct_rows.append({'t': tag_name, 'v': var_name})
             
-            print(f"Created {relationship_count} tag-variable relationships")
+            # All variable relationships with usage count
+            direct_set = set(direct_variables)
+            for var_name, usage_count in tag.get('all_variables', {}).items():
+                if var_name not in direct_set:
+                    uses_rows.append({'t': tag_name, 'v': var_name, 'c': usage_count})
+        
+        self._run_batched("""
+            UNWIND $rows AS r
+            MATCH (t:Tag {name: r.t}), (v:Variable {name: r.v})
+            CREATE (t)-[:USES_DIRECTLY]->(v)
+        """, direct_rows)
+        self._run_batched("""
+            UNWIND $rows AS r
+            MATCH (t:Tag {name: r.t}), (v:Variable {name: r.v})
+            CREATE (t)-[:USES {count: r.c}]->(v)
+        """, uses_rows)
+        
+        print(f"Created {len(direct_rows) + len(uses_rows)} tag-variable relationships")
     
     def _create_variable_dependencies(self, json_data: List[Dict[str, Any]]):
         """Create dependency relationships between variables"""
@@ -394,71 +465,220 @@ class GTMContainerGraphLoader:
             ("UA - transaction revenue 'x-ga-mp1-tr'", "ED - value"),
         ]
         
-        with self.driver.session() as session:
+        query = """
+        UNWIND $rows AS r
+        MATCH (v1:Variable {name: r.dependent}), (v2:Variable {name: r.dependency})
+        CREATE (v1)-[:DEPENDS_ON]->(v2)
+        """
+        rows = [{'dependent': dependent, 'dependency': dependency} for dependent, dependency in dependencies]
+        
+        try:
+            dependency_count = self._run_batched(query, rows)
+        except Exception as e:
             dependency_count = 0
-            for dependent, dependency in dependencies:
-                query = """
-                MATCH (v1:Variable {name: $dependent}), (v2:Variable {name: $dependency})
-                CREATE (v1)-[:DEPENDS_ON]->(v2)
-                """
-                try:
-                    session.run(query, dependent=dependent, dependency=dependency)
-                    dependency_count += 1
-                except Exception as e:
-                    print(f"Could not create dependency {dependent} -> {dependency}: {e}")
-            
-            print(f"Created {dependency_count} variable dependency relationships")
+            print(f"Could not create variable dependencies: {e}")
+        
+        print(f"Created {dependency_count} variable dependency relationships")
     
     def _create_template_relationships(self, json_data: List[Dict[str, Any]]):
         """Create relationships between tags and templates"""
-        with self.driver.session() as session:
-            relationship_count = 0
-            for tag in json_data:
-                template_info = tag.get('custom_template_info')
-                if template_info:
-                    query = """
-                    MATCH (t:Tag {name: $tag_name}), (template:Template {name: $template_name, id: $template_id})
-                    CREATE (t)-[:USES_TEMPLATE]->(template)
-                    """
-                    session.run(query,
-                        tag_name=tag['name'],
-                        template_name=template_info['name'],
-                        template_id=template_info['template_id']
-                    )
-                    relationship_count += 1
-            print(f"Created {relationship_count} tag-template relationships")
+        query = """
+        UNWIND $rows AS r
+        MATCH (t:Tag {name: r.tag_name}), (template:Template {name: r.template_name, id: r.template_id})
+        CREATE (t)-[:USES_TEMPLATE]->(template)
+        """
+        rows = []
+        for tag in json_data:
+            template_info = tag.get('custom_template_info')
+            if template_info:
+                rows.append({
+                    'tag_name': tag['name'],
+                    'template_name': template_info['name'],
+                    'template_id': template_info['template_id']
+                })
+        
+        self._run_batched(query, rows)
+        print(f"Created {len(rows)} tag-template relationships")
     
     def _create_category_relationships(self):
         """Create relationships between variables and categories"""
-        with self.driver.session() as session:
+        # Drive from the few categories and seek variables through the
+        # Variable(category) index rather than filtering a cartesian product
+        with self.driver.session(database=self.db_name) as session:
             query = """
-            MATCH (v:Variable), (c:Category)
-            WHERE v.category = c.name
+            MATCH (c:Category)
+            MATCH (v:Variable {category: c.name})
             CREATE (v)-[:BELONGS_TO]->(c)
             """
-            result = session.run(query)
+            session.run(query).consume()
             print("Created variable-category relationships")
     
     def _create_tag_type_relationships(self, json_data: List[Dict[str, Any]]):
         """Create relationships between tags and tag types"""
-        with self.driver.session() as session:
-            for tag in json_data:
-                query = """
-                MATCH (t:Tag {name: $tag_name}), (tt:TagType {name: $tag_type})
-                CREATE (t)-[:IS_TYPE]->(tt)
-                """
-                session.run(query, tag_name=tag['name'], tag_type=tag['type'])
-            print("Created tag-type relationships")
+        query = """
+        UNWIND $rows AS r
+        MATCH (t:Tag {name: r.tag_name}), (tt:TagType {name: r.tag_type})
+        CREATE (t)-[:IS_TYPE]->(tt)
+        """
+        rows = [{'tag_name': tag['name'], 'tag_type': tag['type']} for tag in json_data]
+        self._run_batched(query, rows)
+        print("Created tag-type relationships")
     
     def run_analysis_query(self, query: str, description: str = ""):
-        """Run an analysis query and return results"""
-        with self.driver.session() as session:
-            result = session.run(query)
-            records = [record.data() for record in result]
-            if description:
-                print(f"\n{description}")
-                print("-" * len(description))
-            return records
+        """Run an analysis query and yield its records as they arrive"""
+        if description:
+            print(f"\n{description}")
+            print("-" * len(description))
+        # The session stays open while the caller iterates, so records are
+        # pulled from the server in fetch-size chunks rather than all at once
+        with self.driver.session(database=self.db_name) as session:
+            for record in session.run(query):
+                yield record.data()
+    
+    def submit_query(self, query: str, **params) -> Future:
+        """Queue a read query on a background worker; the future resolves to its records"""
+        if self._query_pool is None:
+            self._query_pool = ThreadPoolExecutor(max_workers=max(self.workers, 1))
+        return self._query_pool.submit(self._read_records, query, params)
+    
+    def query_results(self, future: Future, description: str = ""):
+        """Wait for a submitted query and return its records"""
+        records = future.result()
+        if description:
+            print(f"\n{description}")
+            print("-" * len(description))
+        return records
+    
+    def _read_records(self, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run a read query on its own session and return plain dict records"""
+        with self.driver.session(database=self.db_name) as session:
+            return session.execute_read(lambda tx: [record.data() for record in tx.run(query, params)])
+
+# neo4j-admin import header types for the Python values found in the dataset
+_CSV_TYPES = {bool: 'boolean', int: 'long', float: 'double', str: 'string'}
+
+def _iter_dataset_items(path: str, key: str):
+    """Stream the items of one top-level array of the dataset file with ijson"""
+    with open(path, 'rb') as f:
+        yield from ijson.items(f, f'{key}.item', use_float=True)
+
+def _csv_type(values: set) -> str:
+    """Pick the import type for a property, falling back to string on mixed types"""
+    is_array = any(issubclass(t, list) for t in values)
+    scalar_types = {t for t in values if not issubclass(t, list)}
+    # bool is a subclass of int, so only an exact single type keeps its mapping
+    csv_type = _CSV_TYPES.get(scalar_types.pop(), 'string') if len(scalar_types) == 1 else 'string'
+    return csv_type + ('[]' if is_array else '')
+
+def _csv_value(value) -> str:
+    """Format a property value as a neo4j-admin import field"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, list):
+        return ';'.join(_csv_value(item) for item in value)
+    return str(value)
+
+def _property_schema(items: Iterable[Dict[str, Any]], group_key) -> Dict[Any, Dict[str, set]]:
+    """Collect the property names and value types used by each group of items"""
+    schema = defaultdict(lambda: defaultdict(set))
+    for item in items:
+        columns = schema[group_key(item)]
+        for name, value in (item.get('properties') or {}).items():
+            if value is None:
+                columns.setdefault(name, set())
+            elif isinstance(value, list):
+                columns[name].add(list)
+                columns[name].update(type(v) for v in value)
+            else:
+                columns[name].add(type(value))
+    return schema
+
+def write_bulk_import_csv(path: str, out_dir: str):
+    """Write the dataset as neo4j-admin import CSVs, one file per label set / relationship type.
+    
+    The input is streamed twice per section: once to learn the columns each
+    file needs, once to write the rows. Without ijson the file is parsed once
+    and the loaded lists serve all four passes. Returns the node and
+    relationship file paths with the relationship type each file belongs to.
+    """
+    if ijson is not None:
+        section = lambda key: _iter_dataset_items(path, key)
+    else:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        dataset = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        section = lambda key: dataset.get(key, [])
+    
+    os.makedirs(out_dir, exist_ok=True)
+    node_labels = lambda node: tuple(node['labels'])
+    rel_type = lambda rel: rel['type']
+    
+    node_files = {}
+    for labels, columns in _property_schema(section('nodes'), node_labels).items():
+        file_name = os.path.join(out_dir, f"nodes_{'_'.join(labels) or 'unlabelled'}.csv")
+        header = ['id:ID', ':LABEL'] + [
+            f"{name}:{_csv_type(types)}" for name, types in columns.items() if name != 'id'
+        ]
+        node_files[labels] = (file_name, [name for name in columns if name != 'id'])
+        with open(file_name, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(header)
+    
+    rel_files = {}
+    for rel_type_name, columns in _property_schema(section('relationships'), rel_type).items():
+        file_name = os.path.join(out_dir, f"rels_{rel_type_name}.csv")
+        header = [':START_ID', ':END_ID'] + [f"{name}:{_csv_type(types)}" for name, types in columns.items()]
+        rel_files[rel_type_name] = (file_name, list(columns))
+        with open(file_name, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(header)
+    
+    # Append rows with a large write buffer per file
+    handles = {}
+    try:
+        for node in section('nodes'):
+            labels = node_labels(node)
+            file_name, columns = node_files[labels]
+            if labels not in handles:
+                f = open(file_name, 'a', newline='', encoding='utf-8', buffering=1 << 20)
+                handles[labels] = (f, csv.writer(f))
+            properties = node.get('properties') or {}
+            handles[labels][1].writerow(
+                [node['id'], ';'.join(('Node',) + labels)] +
+                [_csv_value(properties.get(name)) for name in columns]
+            )
+        
+        for rel in section('relationships'):
+            key = ('rel', rel_type(rel))
+            file_name, columns = rel_files[rel_type(rel)]
+            if key not in handles:
+                f = open(file_name, 'a', newline='', encoding='utf-8', buffering=1 << 20)
+                handles[key] = (f, csv.writer(f))
+            properties = rel.get('properties') or {}
+            handles[key][1].writerow(
+                [rel['startNode'], rel['endNode']] +
+                [_csv_value(properties.get(name)) for name in columns]
+            )
+    finally:
+        for f, _ in handles.values():
+            f.close()
+    
+    return (
+        [file_name for file_name, _ in node_files.values()],
+        {rel_type_name: file_name for rel_type_name, (file_name, _) in rel_files.items()},
+    )
+
+def run_bulk_import(node_files: List[str], rel_files: Dict[str, str], database: str = 'neo4j') -> int:
+    """Run neo4j-admin full import over the written CSVs and return its exit code"""
+    command = ['neo4j-admin', 'database', 'import', 'full', database, '--overwrite-destination']
+    command += [f"--nodes={file_name}" for file_name in node_files]
+    command += [f"--relationships={rel_type}={file_name}" for rel_type, file_name in rel_files.items()]
+    print("Running: " + ' '.join(command))
+    try:
+        return subprocess.run(command).returncode
+    except FileNotFoundError:
+        print("Error: neo4j-admin not found on PATH")
+        return 1
 
 # Main function for command line usage
 def main():
@@ -474,6 +694,15 @@ def main():
                        help='Neo4j password')
     parser.add_argument('--clear', action='store_true',
                        help='Clear existing data before loading')
+    parser.add_argument('--database', default='neo4j',
+                       help='Target Neo4j database (default: neo4j)')
+    parser.add_argument('--no-stream', action='store_true',
+                       help='Parse the whole file at once instead of streaming it')
+    parser.add_argument('--workers', type=int, default=8,
+                       help='Parallel write workers, 1 to load sequentially (default: 8)')
+    parser.add_argument('--bulk-import', metavar='CSV_DIR',
+                       help='With --clear, write neo4j-admin import CSVs to CSV_DIR and run an '
+                            'offline full import instead of loading over bolt (database must be stopped)')
     
     args = parser.parse_args()
     
@@ -482,25 +711,47 @@ def main():
         print(f"Error: Dataset file '{args.dataset}' not found.")
         sys.exit(1)
     
-    # Load dataset
-    print(f"Loading dataset from {args.dataset}...")
-    with open(args.dataset, 'r', encoding='utf-8') as f:
-        dataset = json.load(f)
+    # Cold bootstrap: offline import replaces the database, so only with --clear
+    if args.bulk_import:
+        if not args.clear:
+            print("Error: --bulk-import replaces the database and requires --clear")
+            sys.exit(1)
+        print(f"Writing import CSVs to {args.bulk_import}...")
+        node_files, rel_files = write_bulk_import_csv(args.dataset, args.bulk_import)
+        print(f"✓ Wrote {len(node_files)} node files and {len(rel_files)} relationship files")
+        returncode = run_bulk_import(node_files, rel_files, args.database)
+        if returncode != 0:
+            sys.exit(returncode)
+        print("\n✅ Import finished. Start the database, then create constraints and indexes")
+        print("   with GTMContainerGraphLoader.create_constraints_and_indexes().")
+        return
     
     # Initialize loader
-    loader = GTMContainerGraphLoader(args.uri, args.user, args.password)
+    loader = GTMContainerGraphLoader(args.uri, args.user, args.password, args.database,
+                                     workers=args.workers)
     
     try:
-        # Load the dataset
-        loader.load_dataset(dataset, clear_existing=args.clear)
-        
-        # Run some example queries
-        print("\n" + "="*60)
-        print("EXAMPLE QUERIES")
-        print("="*60)
+        if ijson is not None and not args.no_stream:
+            # Stream the dataset: one reader per top-level array, so nodes and
+            # relationships are parsed item by item instead of held in memory
+            print(f"Streaming dataset from {args.dataset}...")
+            with open(args.dataset, 'rb') as nodes_file, open(args.dataset, 'rb') as rels_file:
+                dataset = {
+                    'nodes': ijson.items(nodes_file, 'nodes.item', use_float=True),
+                    'relationships': ijson.items(rels_file, 'relationships.item', use_float=True),
+                }
+                loader.load_dataset(dataset, clear_existing=args.clear)
+        else:
+            print(f"Loading dataset from {args.dataset}...")
+            with open(args.dataset, 'rb') as f:
+                raw = f.read()
+            dataset = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            del raw
+            loader.load_dataset(dataset, clear_existing=args.clear)
         
+        # Run some example queries, all submitted before any result is awaited
         # Most connected variables
-        most_connected = loader.run_analysis_query("""
+        most_connected = loader.submit_query("""
             MATCH (v:Variable)
             OPTIONAL MATCH (v)<-[r:USES_VARIABLE|REFERENCES_VARIABLE]-()
             WITH v, count(r) as connections
@@ -508,28 +759,32 @@ def main():
             RETURN v.name as variable, v.type as type, connections
             ORDER BY connections DESC
             LIMIT 10
-        """, "\nTop 10 Most Connected Variables:")
-        
-        for record in most_connected:
-            print(f"  {record['variable']} ({record['type']}): {record['connections']} connections")
+        """)
         
         # Unused variables count
-        unused_count = loader.run_analysis_query("""
+        unused_count = loader.submit_query("""
             MATCH (v:Variable)
             WHERE v.is_used = false
             RETURN count(v) as count
-        """, "\nUnused Variables:")
-        
-        for record in unused_count:
-            print(f"  Total: {record['count']} unused variables")
+        """)
         
         # Container health
-        health = loader.run_analysis_query("""
+        health = loader.submit_query("""
             MATCH (c:Container)
             RETURN c.name as name, c.health_score as score, c.total_variables as vars
-        """, "\nContainer Health:")
+        """)
+        
+        print("\n" + "="*60)
+        print("EXAMPLE QUERIES")
+        print("="*60)
+        
+        for record in loader.query_results(most_connected, "\nTop 10 Most Connected Variables:"):
+            print(f"  {record['variable']} ({record['type']}): {record['connections']} connections")
+        
+        for record in loader.query_results(unused_count, "\nUnused Variables:"):
+            print(f"  Total: {record['count']} unused variables")
         
-        for record in health:
+        for record in loader.query_results(health, "\nContainer Health:"):
             print(f"  {record['name']}: Health Score {record['score']}/100 ({record['vars']} variables)")
         
     except Exception as e:
@@ -1,11 +1,205 @@
+import csv
 import json
-from neo4j import GraphDatabase
-from typing import Dict, List, Any
+import os
+import re
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate, islice
+from neo4j import GraphDatabase, READ_ACCESS, WRITE_ACCESS
+from typing import Dict, List, Any, Iterable
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+def _compile_category_db(rules) -> 'hyperscan.Database':
+    """Compile category keywords into a Hyperscan block-mode database, tagged by rule index"""
+    expressions, ids = [], []
+    for rule, (_, keywords) in enumerate(rules):
+        for keyword in keywords:
+            expressions.append(re.escape(keyword).encode())
+            ids.append(rule)
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(expressions=expressions, ids=ids, elements=len(expressions))
+    return db
+
+def _in_transactions(body: str, batch_size: int = 1000) -> str:
+    """Wrap a per-row write so the server commits it batch_size rows at a time.
+    
+    CALL { ... } IN TRANSACTIONS is the built-in equivalent of
+    apoc.periodic.iterate and needs an auto-commit transaction. The body sees
+    each row as r.
+    """
+    return f"UNWIND $rows AS r CALL {{ WITH r {body} }} IN TRANSACTIONS OF {batch_size} ROWS"
+
+# Write queries are fixed strings, so each is planned once and then served
+# from the server's plan cache; create_indexes warms them with EXPLAIN.
+# Nodes and relationships are both MERGEd, so re-running the loader against a
+# populated database does not duplicate anything (USES counts are overwritten)
+_TAG_NODES = """
+UNWIND $rows AS r
+MERGE (t:Tag {name: r.name})
+ON CREATE SET
+    t.type = r.type,
+    t.template_name = r.template_name,
+    t.template_id = r.template_id,
+    t.direct_variable_count = r.direct_count,
+    t.total_variable_count = r.total_count
+"""
+_VARIABLE_NODES = """
+UNWIND $rows AS r
+MERGE (v:Variable {name: r.name})
+ON CREATE SET v.category = r.category
+"""
+_CATEGORY_NODES = "UNWIND $rows AS r MERGE (c:Category {name: r.name})"
+_TEMPLATE_NODES = """
+UNWIND $rows AS r
+MERGE (template:Template {id: r.id})
+ON CREATE SET template.name = r.name
+"""
+_TAG_TYPE_NODES = "UNWIND $rows AS r MERGE (tt:TagType {name: r.name})"
+_USES_DIRECTLY_EDGES = _in_transactions("""
+MATCH (t:Tag {name: r.t}), (v:Variable {name: r.v})
+MERGE (t)-[:USES_DIRECTLY]->(v)
+""")
+_USES_EDGES = _in_transactions("""
+MATCH (t:Tag {name: r.t}), (v:Variable {name: r.v})
+MERGE (t)-[u:USES]->(v)
+SET u.count = r.c
+""")
+_USES_TEMPLATE_EDGES = _in_transactions("""
+MATCH (t:Tag {name: r.t}), (template:Template {id: r.tid})
+MERGE (t)-[:USES_TEMPLATE]->(template)
+""")
+_BELONGS_TO_EDGES = _in_transactions("""
+MATCH (v:Variable {name: r.v}), (c:Category {name: r.c})
+MERGE (v)-[:BELONGS_TO]->(c)
+""")
+_IS_TYPE_EDGES = _in_transactions("""
+MATCH (t:Tag {name: r.t}), (tt:TagType {name: r.tt})
+MERGE (t)-[:IS_TYPE]->(tt)
+""")
+# A row whose variables are missing matches nothing and is skipped
+_DEPENDS_ON_EDGES = """
+UNWIND $rows AS r
+MATCH (v1:Variable {name: r.d}), (v2:Variable {name: r.p})
+MERGE (v1)-[:DEPENDS_ON]->(v2)
+"""
+
+# LOAD CSV bodies for each extracted row set, nodes first; every CSV value
+# arrives as a string and empty fields as null
+_CSV_LOADS = {
+    'tags': """
+        MERGE (t:Tag {name: row.name})
+        ON CREATE SET
+            t.type = row.type,
+            t.template_name = row.template_name,
+            t.template_id = row.template_id,
+            t.direct_variable_count = toInteger(row.direct_count),
+            t.total_variable_count = toInteger(row.total_count)
+    """,
+    'variables': "MERGE (v:Variable {name: row.name}) ON CREATE SET v.category = row.category",
+    'categories': "MERGE (c:Category {name: row.name})",
+    'templates': "MERGE (template:Template {id: row.id}) ON CREATE SET template.name = row.name",
+    'tag_types': "MERGE (tt:TagType {name: row.name})",
+    'direct_edges': """
+        MATCH (t:Tag {name: row.t}), (v:Variable {name: row.v})
+        MERGE (t)-[:USES_DIRECTLY]->(v)
+    """,
+    'uses_edges': """
+        MATCH (t:Tag {name: row.t}), (v:Variable {name: row.v})
+        MERGE (t)-[u:USES]->(v)
+        SET u.count = toInteger(row.c)
+    """,
+    'template_edges': """
+        MATCH (t:Tag {name: row.t}), (template:Template {id: row.tid})
+        MERGE (t)-[:USES_TEMPLATE]->(template)
+    """,
+    'belongs_edges': """
+        MATCH (v:Variable {name: row.v}), (c:Category {name: row.c})
+        MERGE (v)-[:BELONGS_TO]->(c)
+    """,
+    'type_edges': """
+        MATCH (t:Tag {name: row.t}), (tt:TagType {name: row.tt})
+        MERGE (t)-[:IS_TYPE]->(tt)
+    """,
+}
+
+_WRITE_QUERIES = (
+    _TAG_NODES, _VARIABLE_NODES, _CATEGORY_NODES, _TEMPLATE_NODES, _TAG_TYPE_NODES,
+    _USES_DIRECTLY_EDGES, _USES_EDGES, _USES_TEMPLATE_EDGES, _BELONGS_TO_EDGES, _IS_TYPE_EDGES,
+    _DEPENDS_ON_EDGES,
+)
 
 class GTMContainerGraphLoader:
-    def __init__(self, uri: str, user: str, password: str):
-        """Initialize Neo4j connection"""
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    # Naming rules checked in order; the first rule with a matching keyword wins
+    _CATEGORY_RULES = (
+        ('Session', ('session',)),
+        ('Ecommerce', ('transaction', 'purchase', 'revenue')),
+        ('Item', ('item',)),
+        ('Currency', ('currency',)),
+        ('Firestore', ('firestore',)),
+        ('Cookie', ('cookie', '_fb', '_ga')),
+        ('Page', ('page_', 'hostname')),
+        ('User', ('user', 'client_id')),
+        ('Custom Dimension', ('cd', 'dimension')),
+        ('Custom Group', ('cg',)),
+        ('Event', ('event',)),
+        ('Campaign', ('campaign',)),
+        ('Facebook', ('fb', 'facebook')),
+        ('TikTok', ('tiktok', 'ttclid', '_ttp')),
+        ('Bing', ('bing', '_uet')),
+        ('Meiro', ('meiro',)),
+        ('Constant', ('const', 'undefined')),
+        ('Header', ('header',)),
+        ('Domain', ('domain',)),
+        ('Test', ('test',)),
+    )
+    _CATEGORY_NAMES = tuple(name for name, _ in _CATEGORY_RULES)
+    # One lookahead branch per rule, each with an empty group so lastindex names
+    # the rule. Branches are tried in order from the start of the string, so rule
+    # order decides the category, not where in the name a keyword appears.
+    _CATEGORY_PATTERN = re.compile(
+        r'\A(?:' + '|'.join(
+            f"(?=.*?(?:{'|'.join(map(re.escape, keywords))}))()"
+            for _, keywords in _CATEGORY_RULES
+        ) + ')',
+        re.DOTALL,
+    )
+    # Optional: all keywords in one Hyperscan database for batch categorization
+    _CATEGORY_DB = _compile_category_db(_CATEGORY_RULES) if hyperscan is not None else None
+    
+    def __init__(self, uri: str, user: str, password: str, database: str = 'neo4j',
+                 max_connection_pool_size: int = 32, connection_acquisition_timeout: float = 60.0,
+                 max_connection_lifetime: float = 3600.0):
+        """Initialize Neo4j connection
+        
+        The driver is thread-safe and owns the connection pool, so one instance
+        is shared by every session the loader opens, including the parallel
+        node phases, for as long as the loader lives.
+        """
+        self.driver = GraphDatabase.driver(
+            uri,
+            auth=(user, password),
+            max_connection_pool_size=max_connection_pool_size,
+            connection_acquisition_timeout=connection_acquisition_timeout,
+            max_connection_lifetime=max_connection_lifetime,
+            keep_alive=True
+        )
+        # Naming the database skips the home-database resolution round-trip per session
+        self.database = database
+        # Whether the server offers the parallel runtime; probed on first use
+        self._parallel_runtime = None
+    
+    def _session(self, access_mode: str = WRITE_ACCESS):
+        """Open a session pinned to the target database and access mode"""
+        return self.driver.session(database=self.database, default_access_mode=access_mode)
     
     def close(self):
         """Close the database connection"""
@@ -13,220 +207,278 @@ class GTMContainerGraphLoader:
     
     def clear_database(self):
         """Clear all existing data"""
-        with self.driver.session() as session:
+        with self._session() as session:
             session.run("MATCH (n) DETACH DELETE n")
             print("Database cleared successfully")
     
     def create_indexes(self):
-        """Create indexes for better performance"""
-        with self.driver.session() as session:
+        """Create unique constraints and indexes for better performance"""
+        with self._session() as session:
+            # Plain indexes from earlier runs would clash with the constraints
+            # that now cover the same properties
+            for old_index in ("tag_name_index", "variable_name_index", "category_name_index"):
+                session.run(f"DROP INDEX {old_index} IF EXISTS")
+            
+            # Unique constraints back MERGE and the relationship MATCHes with an index
             indexes = [
-                "CREATE INDEX tag_name_index IF NOT EXISTS FOR (t:Tag) ON (t.name)",
-                "CREATE INDEX variable_name_index IF NOT EXISTS FOR (v:Variable) ON (v.name)",
-                "CREATE INDEX category_name_index IF NOT EXISTS FOR (c:Category) ON (c.name)",
+                "CREATE CONSTRAINT tag_name_unique IF NOT EXISTS FOR (t:Tag) REQUIRE t.name IS UNIQUE",
+                "CREATE CONSTRAINT variable_name_unique IF NOT EXISTS FOR (v:Variable) REQUIRE v.name IS UNIQUE",
+                "CREATE CONSTRAINT category_name_unique IF NOT EXISTS FOR (c:Category) REQUIRE c.name IS UNIQUE",
+                "CREATE CONSTRAINT template_id_unique IF NOT EXISTS FOR (template:Template) REQUIRE template.id IS UNIQUE",
+                "CREATE CONSTRAINT tag_type_name_unique IF NOT EXISTS FOR (tt:TagType) REQUIRE tt.name IS UNIQUE",
                 "CREATE INDEX template_name_index IF NOT EXISTS FOR (template:Template) ON (template.name)"
             ]
             
             for index in indexes:
                 try:
                     session.run(index)
-                    print(f"Index created: {index.split('_index')[0].split()[-1]}")
+                    print(f"Index created: {index.split()[2]}")
                 except Exception as e:
                     print(f"Index creation failed or already exists: {e}")
+            
+            # Make sure the backing indexes are online before the MERGEs rely on them
+            session.run("CALL db.awaitIndexes(300)")
+            
+            # Plan every write query now that the indexes exist, so the load
+            # phases start with warm plan-cache entries
+            for query in _WRITE_QUERIES:
+                session.run(f"EXPLAIN {query}", rows=[]).consume()
     
-    def load_gtm_data(self, json_data: List[Dict[str, Any]]):
-        """Load GTM container data into Neo4j"""
-        
-        # Extract all unique variables and their metadata
-        all_variables = set()
+    def load_gtm_data(self, json_data: Iterable[Dict[str, Any]], batch_size: int = 1000):
+        """Load GTM container data into Neo4j, batch_size tags at a time"""
+        # Shared across batches so each variable gets one node and one category edge
         variable_categories = {}
         
-        for tag in json_data:
-            for var_name in tag.get('all_variables', {}):
-                all_variables.add(var_name)
-                # Categorize variables based on naming patterns
-                category = self._categorize_variable(var_name)
-                variable_categories[var_name] = category
+        tags = iter(json_data)
+        for batch in iter(lambda: list(islice(tags, batch_size)), []):
+            self.ingest_batch(batch, variable_categories)
+        
+        # Dependencies link variables from any batch, so they go in last
+        with self._session() as session:
+            self._create_variable_dependencies(session)
+        
+        print("GTM container data loaded successfully!")
+    
+    def ingest_batch(self, json_data: List[Dict[str, Any]], variable_categories: Dict[str, str] = None):
+        """Load one batch of tags with their variables, templates and edges
+        
+        variable_categories holds the variables loaded by earlier batches and is
+        updated in place; only variables new to it get nodes and category edges.
+        """
+        # Build the rows for every node and edge phase in one walk over the tags
+        rows = self._extract_all_rows(json_data, variable_categories)
+        
+        # Create nodes: each phase writes its own label, so they run side by
+        # side on separate sessions; leaving the pool waits for all of them
+        node_phases = [
+            (self._create_tag_nodes, rows['tags']),
+            (self._create_variable_nodes, rows['variables']),
+            (self._create_category_nodes, rows['categories']),
+            (self._create_template_nodes, rows['templates']),
+            (self._create_tag_type_nodes, rows['tag_types']),
+        ]
+        with ThreadPoolExecutor(max_workers=len(node_phases)) as executor:
+            futures = [executor.submit(self._run_in_session, *phase) for phase in node_phases]
+            for future in futures:
+                future.result()
+        
+        # One session for the relationship phases, which need all nodes in place
+        with self._session() as session:
+            # Create relationships
+            self._create_tag_variable_relationships(session, rows['direct_edges'], rows['uses_edges'])
+            self._create_template_relationships(session, rows['template_edges'])
+            self._create_category_relationships(session, rows['belongs_edges'])
+            self._create_tag_type_relationships(session, rows['type_edges'])
+    
+    def load_gtm_data_csv(self, json_data: Iterable[Dict[str, Any]], import_dir: str):
+        """Load GTM container data through LOAD CSV, for a first load into an empty database
         
-        # Create nodes
-        self._create_tag_nodes(json_data)
-        self._create_variable_nodes(all_variables, variable_categories)
-        self._create_category_nodes(set(variable_categories.values()))
-        self._create_template_nodes(json_data)
-        self._create_tag_type_nodes(json_data)
+        import_dir must be the server's import directory (server.directories.import),
+        since LOAD CSV resolves file:/// URLs against it. Each file is committed
+        in transactions of 5000 rows.
+        """
+        files = self._write_csvs(json_data, import_dir)
         
-        # Create relationships
-        self._create_tag_variable_relationships(json_data)
-        self._create_variable_dependencies(json_data)
-        self._create_template_relationships(json_data)
-        self._create_category_relationships()
-        self._create_tag_type_relationships(json_data)
+        with self._session() as session:
+            for phase, body in _CSV_LOADS.items():
+                if phase not in files:
+                    continue
+                session.run(
+                    f"LOAD CSV WITH HEADERS FROM $url AS row "
+                    f"CALL {{ WITH row {body} }} IN TRANSACTIONS OF 5000 ROWS",
+                    url=f"file:///{files[phase]}"
+                ).consume()
+                print(f"Loaded {phase} from {files[phase]}")
+            
+            self._create_variable_dependencies(session)
         
         print("GTM container data loaded successfully!")
     
+    def _write_csvs(self, json_data: Iterable[Dict[str, Any]], out_dir: str) -> Dict[str, str]:
+        """Write the extracted rows as header-first CSVs, one file per load phase
+        
+        Returns the file name written for each phase; phases with no rows are skipped.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        files = {}
+        for phase, rows in self._extract_all_rows(json_data).items():
+            if not rows:
+                continue
+            file_name = f"gtm_{phase}.csv"
+            with open(os.path.join(out_dir, file_name), 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+            files[phase] = file_name
+        return files
+    
+    def _run_in_session(self, fn, *args):
+        """Call a session-taking helper on a session of its own"""
+        with self._session() as session:
+            return fn(session, *args)
+    
     def _categorize_variable(self, var_name: str) -> str:
         """Categorize variables based on naming patterns"""
-        var_lower = var_name.lower()
+        m = self._CATEGORY_PATTERN.match(var_name.lower())
+        return self._CATEGORY_NAMES[m.lastindex - 1] if m else 'Other'
+    
+    def _categorize_variables(self, var_names: List[str]) -> List[str]:
+        """Categorize many variables at once, in a single Hyperscan scan when available"""
+        if self._CATEGORY_DB is None:
+            return [self._categorize_variable(var_name) for var_name in var_names]
+        
+        # Scan all names newline-separated in one call. No keyword contains a
+        # newline, so every match ends inside exactly one name, found by bisect
+        lowered = [var_name.lower().encode('utf-8') for var_name in var_names]
+        ends = list(accumulate(len(name) + 1 for name in lowered))
+        no_match = len(self._CATEGORY_NAMES)
+        best = [no_match] * len(lowered)
+        
+        def on_match(rule, start, end, flags, context):
+            i = bisect_left(ends, end)
+            # Lowest rule index wins, as in the ordered rule table
+            if rule < best[i]:
+                best[i] = rule
+        
+        self._CATEGORY_DB.scan(b'\n'.join(lowered), match_event_handler=on_match)
+        return [self._CATEGORY_NAMES[rule] if rule != no_match else 'Other' for rule in best]
+    
+    def _extract_all_rows(self, json_data: List[Dict[str, Any]],
+                          known_categories: Dict[str, str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Walk the tags once and build the UNWIND rows for each load phase
+        
+        Variables already in known_categories are skipped for the variable and
+        category rows; the new ones are added to it.
+        """
+        tag_rows = []
+        type_edges = []
+        direct_edges = []
+        uses_edges = []
+        template_edges = []
+        if known_categories is None:
+            known_categories = {}
+        variable_categories = {}
+        templates = set()
+        tag_types = set()
+        
+        for tag in json_data:
+            tag_name = tag['name']
+            template_info = tag.get('custom_template_info', {}) or {}
+            direct_variables = tag.get('direct_variables', [])
+            all_variables = tag.get('all_variables', {})
+            
+            tag_rows.append({
+                'name': tag_name,
+                'type': tag['type'],
+                'template_name': template_info.get('name'),
+                'template_id': template_info.get('template_id'),
+                'direct_count': len(direct_variables),
+                'total_count': len(all_variables)
+            })
+            tag_types.add(tag['type'])
+            type_edges.append({'t': tag_name, 'tt': tag['type']})
+            if template_info:
+                templates.add((template_info['name'], template_info['template_id']))
+                template_edges.append({'t': tag_name, 'tid': template_info['template_id']})
+            
+            # Direct variable relationships
+            for var_name in direct_variables:
+                direct_edges.append({'t': tag_name, 'v': var_name})
+            
+            # All variable relationships with usage count
+            direct_set = set(direct_variables)
+            for var_name, usage_count in all_variables.items():
+                if var_name not in known_categories:
+                    variable_categories[var_name] = None
+                if var_name not in direct_set:
+                    uses_edges.append({'t': tag_name, 'v': var_name, 'c': usage_count})
+        
+        # Categorize variables based on naming patterns, once per unique name
+        variable_categories = dict(zip(variable_categories, self._categorize_variables(list(variable_categories))))
+        known_categories.update(variable_categories)
         
-        if 'session' in var_lower:
-            return 'Session'
-        elif 'transaction' in var_lower or 'purchase' in var_lower or 'revenue' in var_lower:
-            return 'Ecommerce'
-        elif 'item' in var_lower:
-            return 'Item'
-        elif 'currency' in var_lower:
-            return 'Currency'
-        elif 'firestore' in var_lower:
-            return 'Firestore'
-        elif 'cookie' in var_lower or '_fb' in var_lower or '_ga' in var_lower:
-            return 'Cookie'
-        elif 'page_' in var_lower or 'hostname' in var_lower:
-            return 'Page'
-        elif 'user' in var_lower or 'client_id' in var_lower:
-            return 'User'
-        elif 'cd' in var_lower or 'dimension' in var_lower:
-            return 'Custom Dimension'
-        elif 'cg' in var_lower:
-            return 'Custom Group'
-        elif 'event' in var_lower:
-            return 'Event'
-        elif 'campaign' in var_lower:
-            return 'Campaign'
-        elif 'fb' in var_lower or 'facebook' in var_lower:
-            return 'Facebook'
-        elif 'tiktok' in var_lower or 'ttclid' in var_lower or '_ttp' in var_lower:
-            return 'TikTok'
-        elif 'bing' in var_lower or '_uet' in var_lower:
-            return 'Bing'
-        elif 'meiro' in var_lower:
-            return 'Meiro'
-        elif 'const' in var_lower or 'undefined' in var_lower:
-            return 'Constant'
-        elif 'header' in var_lower:
-            return 'Header'
-        elif 'domain' in var_lower:
-            return 'Domain'
-        elif 'test' in var_lower:
-            return 'Test'
-        else:
-            return 'Other'
+        return {
+            'tags': tag_rows,
+            'variables': [{'name': name, 'category': category} for name, category in variable_categories.items()],
+            'categories': [{'name': category} for category in set(variable_categories.values())],
+            'templates': [{'name': name, 'id': template_id} for name, template_id in templates],
+            'tag_types': [{'name': tag_type} for tag_type in tag_types],
+            'direct_edges': direct_edges,
+            'uses_edges': uses_edges,
+            'template_edges': template_edges,
+            'type_edges': type_edges,
+            'belongs_edges': [{'v': name, 'c': category} for name, category in variable_categories.items()],
+        }
     
-    def _create_tag_nodes(self, json_data: List[Dict[str, Any]]):
+    def _create_tag_nodes(self, session, rows: List[Dict[str, Any]]):
         """Create tag nodes"""
-        with self.driver.session() as session:
-            for tag in json_data:
-                query = """
-                CREATE (t:Tag {
-                    name: $name,
-                    type: $type,
-                    template_name: $template_name,
-                    template_id: $template_id,
-                    direct_variable_count: $direct_count,
-                    total_variable_count: $total_count
-                })
-                """
-                
-                template_info = tag.get('custom_template_info', {}) or {}
-                
-                session.run(query, 
-                    name=tag['name'],
-                    type=tag['type'],
-                    template_name=template_info.get('name'),
-                    template_id=template_info.get('template_id'),
-                    direct_count=len(tag.get('direct_variables', [])),
-                    total_count=len(tag.get('all_variables', {}))
-                )
-            print(f"Created {len(json_data)} tag nodes")
+        self._run_batched(session, _TAG_NODES, rows)
+        print(f"Created {len(rows)} tag nodes")
     
-    def _create_variable_nodes(self, variables: set, categories: dict):
+    def _create_variable_nodes(self, session, rows: List[Dict[str, Any]]):
         """Create variable nodes"""
-        with self.driver.session() as session:
-            for var_name in variables:
-                query = """
-                CREATE (v:Variable {
-                    name: $name,
-                    category: $category
-                })
-                """
-                session.run(query, 
-                    name=var_name,
-                    category=categories.get(var_name, 'Other')
-                )
-            print(f"Created {len(variables)} variable nodes")
+        self._run_batched(session, _VARIABLE_NODES, rows)
+        print(f"Created {len(rows)} variable nodes")
     
-    def _create_category_nodes(self, categories: set):
+    def _create_category_nodes(self, session, rows: List[Dict[str, Any]]):
         """Create category nodes"""
-        with self.driver.session() as session:
-            for category in categories:
-                query = "CREATE (c:Category {name: $name})"
-                session.run(query, name=category)
-            print(f"Created {len(categories)} category nodes")
+        self._run_batched(session, _CATEGORY_NODES, rows)
+        print(f"Created {len(rows)} category nodes")
     
-    def _create_template_nodes(self, json_data: List[Dict[str, Any]]):
+    def _create_template_nodes(self, session, rows: List[Dict[str, Any]]):
         """Create template nodes"""
-        templates = set()
-        with self.driver.session() as session:
-            for tag in json_data:
-                template_info = tag.get('custom_template_info')
-                if template_info:
-                    template_key = (template_info['name'], template_info['template_id'])
-                    if template_key not in templates:
-                        templates.add(template_key)
-                        query = """
-                        CREATE (template:Template {
-                            name: $name,
-                            id: $id
-                        })
-                        """
-                        session.run(query, 
-                            name=template_info['name'],
-                            id=template_info['template_id']
-                        )
-            print(f"Created {len(templates)} template nodes")
+        self._run_batched(session, _TEMPLATE_NODES, rows)
+        print(f"Created {len(rows)} template nodes")
     
-    def _create_tag_type_nodes(self, json_data: List[Dict[str, Any]]):
+    def _create_tag_type_nodes(self, session, rows: List[Dict[str, Any]]):
         """Create tag type nodes"""
-        tag_types = set(tag['type'] for tag in json_data)
-        with self.driver.session() as session:
-            for tag_type in tag_types:
-                query = "CREATE (tt:TagType {name: $name})"
-                session.run(query, name=tag_type)
-            print(f"Created {len(tag_types)} tag type nodes")
+        self._run_batched(session, _TAG_TYPE_NODES, rows)
+        print(f"Created {len(rows)} tag type nodes")
     
-    def _create_tag_variable_relationships(self, json_data: List[Dict[str, Any]]):
+    def _create_tag_variable_relationships(self, session, direct_rows: List[Dict[str, Any]],
+                                           uses_rows: List[Dict[str, Any]]):
         """Create relationships between tags and variables"""
-        with self.driver.session() as session:
-            relationship_count = 0
-            
-            for tag in json_data:
-                tag_name = tag['name']
-                
-                # Direct variable relationships
-                for var_name in tag.get('direct_variables', []):
-                    query = """
-                    MATCH (t:Tag {name: $tag_name}), (v:Variable {name: $var_name})
-                    CREATE (t)-[:USES_DIRECTLY]->(v)
-                    """
-                    session.run(query, tag_name=tag_name, var_name=var_name)
-                    relationship_count += 1
-                
-                # All variable relationships with usage count
-                for var_name, usage_count in tag.get('all_variables', {}).items():
-                    if var_name not in tag.get('direct_variables', []):
-                        query = """
-                        MATCH (t:Tag {name: $tag_name}), (v:Variable {name: $var_name})
-                        CREATE (t)-[:USES {count: $usage_count}]->(v)
-                        """
-                        session.run(query, 
-                            tag_name=tag_name, 
-                            var_name=var_name, 
-                            usage_count=usage_count
-                        )
-                        relationship_count += 1
-            
-            print(f"Created {relationship_count} tag-variable relationships")
+        self._run_in_transactions(session, _USES_DIRECTLY_EDGES, direct_rows)
+        self._run_in_transactions(session, _USES_EDGES, uses_rows)
+        
+        print(f"Created {len(direct_rows) + len(uses_rows)} tag-variable relationships")
+    
+    def _run_batched(self, session, query: str, rows: List[Dict[str, Any]], batch_size: int = 10_000):
+        """Run an UNWIND $rows query in slices, one managed write transaction per slice
+        
+        execute_write retries a slice on transient errors such as deadlocks
+        without replaying the slices already committed.
+        """
+        for i in range(0, len(rows), batch_size):
+            session.execute_write(
+                lambda tx, batch=rows[i:i + batch_size]: tx.run(query, rows=batch).consume()
+            )
+    
+    def _run_in_transactions(self, session, query: str, rows: List[Dict[str, Any]]):
+        """Send all rows in one auto-commit call to a query built by _in_transactions"""
+        session.run(query, rows=rows).consume()
     
-    def _create_variable_dependencies(self, json_data: List[Dict[str, Any]]):
+    def _create_variable_dependencies(self, session):
         """Create dependency relationships between variables"""
         dependencies = [
             ("BASE DECODE - heureka_gtm_ga_info", "ED - cookies.heureka_gtm_ga_info"),
@@ -242,65 +494,51 @@ class GTMContainerGraphLoader:
             ("UA - transaction revenue 'x-ga-mp1-tr'", "ED - value"),
         ]
         
-        with self.driver.session() as session:
-            dependency_count = 0
-            for dependent, dependency in dependencies:
-                query = """
-                MATCH (v1:Variable {name: $dependent}), (v2:Variable {name: $dependency})
-                CREATE (v1)-[:DEPENDS_ON]->(v2)
-                """
-                try:
-                    session.run(query, dependent=dependent, dependency=dependency)
-                    dependency_count += 1
-                except Exception as e:
-                    print(f"Could not create dependency {dependent} -> {dependency}: {e}")
-            
-            print(f"Created {dependency_count} variable dependency relationships")
+        rows = [{'d': dependent, 'p': dependency} for dependent, dependency in dependencies]
+        summary = session.run(_DEPENDS_ON_EDGES, rows=rows).consume()
+        print(f"Created {summary.counters.relationships_created} variable dependency relationships")
     
-    def _create_template_relationships(self, json_data: List[Dict[str, Any]]):
+    def _create_template_relationships(self, session, rows: List[Dict[str, Any]]):
         """Create relationships between tags and templates"""
-        with self.driver.session() as session:
-            relationship_count = 0
-            for tag in json_data:
-                template_info = tag.get('custom_template_info')
-                if template_info:
-                    query = """
-                    MATCH (t:Tag {name: $tag_name}), (template:Template {name: $template_name, id: $template_id})
-                    CREATE (t)-[:USES_TEMPLATE]->(template)
-                    """
-                    session.run(query,
-                        tag_name=tag['name'],
-                        template_name=template_info['name'],
-                        template_id=template_info['template_id']
-                    )
-                    relationship_count += 1
-            print(f"Created {relationship_count} tag-template relationships")
+        self._run_in_transactions(session, _USES_TEMPLATE_EDGES, rows)
+        print(f"Created {len(rows)} tag-template relationships")
     
-    def _create_category_relationships(self):
+    def _create_category_relationships(self, session, rows: List[Dict[str, Any]]):
         """Create relationships between variables and categories"""
-        with self.driver.session() as session:
-            query = """
-            MATCH (v:Variable), (c:Category)
-            WHERE v.category = c.name
-            CREATE (v)-[:BELONGS_TO]->(c)
-            """
-            result = session.run(query)
-            print("Created variable-category relationships")
+        # Categories are known client-side, so both ends are unique-index seeks
+        # instead of a Variable x Category cartesian product
+        self._run_in_transactions(session, _BELONGS_TO_EDGES, rows)
+        print(f"Created {len(rows)} variable-category relationships")
     
-    def _create_tag_type_relationships(self, json_data: List[Dict[str, Any]]):
+    def _create_tag_type_relationships(self, session, rows: List[Dict[str, Any]]):
         """Create relationships between tags and tag types"""
-        with self.driver.session() as session:
-            for tag in json_data:
-                query = """
-                MATCH (t:Tag {name: $tag_name}), (tt:TagType {name: $tag_type})
-                CREATE (t)-[:IS_TYPE]->(tt)
-                """
-                session.run(query, tag_name=tag['name'], tag_type=tag['type'])
-            print("Created tag-type relationships")
+        self._run_in_transactions(session, _IS_TYPE_EDGES, rows)
+        print("Created tag-type relationships")
     
-    def run_analysis_query(self, query: str, description: str = ""):
-        """Run an analysis query and return results"""
-        with self.driver.session() as session:
+    def supports_parallel_runtime(self) -> bool:
+        """Check once whether the server has the parallel runtime (Enterprise 5.13+)"""
+        if self._parallel_runtime is None:
+            with self._session(READ_ACCESS) as session:
+                record = session.run(
+                    "CALL dbms.components() YIELD name, versions, edition "
+                    "WHERE name = 'Neo4j Kernel' RETURN versions[0] AS version, edition"
+                ).single()
+            if record is None or record['edition'] != 'enterprise':
+                self._parallel_runtime = False
+            else:
+                major, minor = (int(part) for part in re.findall(r'\d+', record['version'])[:2])
+                # Calendar versions (2025.x) are all newer than 5.13
+                self._parallel_runtime = (major, minor) >= (5, 13)
+        return self._parallel_runtime
+    
+    def run_analysis_query(self, query: str, description: str = "", parallel: bool = True):
+        """Run an analysis query and return results
+        
+        Read-only aggregations go to the parallel runtime when the server has it.
+        """
+        if parallel and self.supports_parallel_runtime():
+            query = "CYPHER runtime=parallel " + query
+        with self._session(READ_ACCESS) as session:
             result = session.run(query)
             records = [record.data() for record in result]
             if description:
@@ -309,15 +547,12 @@ class GTMContainerGraphLoader:
             return records
 
 # Usage example
-def load_gtm_container(json_file_path: str, neo4j_uri: str, username: str, password: str):
+def load_gtm_container(json_file_path: str, neo4j_uri: str, username: str, password: str,
+                       database: str = 'neo4j'):
     """Load GTM container data from JSON file into Neo4j"""
     
-    # Load JSON data
-    with open(json_file_path, 'r') as f:
-        gtm_data = json.load(f)
-    
     # Initialize loader
-    loader = GTMContainerGraphLoader(neo4j_uri, username, password)
+    loader = GTMContainerGraphLoader(neo4j_uri, username, password, database)
     
     try:
         # Clear existing data (optional)
@@ -326,8 +561,10 @@ def load_gtm_container(json_file_path: str, neo4j_uri: str, username: str, passw
         # Create indexes
         loader.create_indexes()
         
-        # Load data
-        loader.load_gtm_data(gtm_data)
+        # Load data, streaming the tag array so only one batch is in memory
+        with open(json_file_path, 'rb') as f:
+            gtm_data = ijson.items(f, 'item', use_float=True) if ijson is not None else json.load(f)
+            loader.load_gtm_data(gtm_data)
         
         print("\nData loading complete!")
         
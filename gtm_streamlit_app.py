@@ -11,22 +11,31 @@ import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
+import numpy as np
 import json
 import re
 import os
+import hashlib
+from collections import Counter
 import importlib.util
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ---------------------------------------------------------------------------
 # Helper: import gtm-analyzer.py (hyphen in filename requires importlib)
 # ---------------------------------------------------------------------------
 @st.cache_resource
-def _load_analyzer_module():
+def _load_analyzer():
+    """Return the GTMAnalyzer class; the module is executed once per server process."""
     analyzer_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gtm-analyzer.py")
     spec = importlib.util.spec_from_file_location("gtm_analyzer", analyzer_path)
     mod = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(mod)
-    return mod
+    return mod.GTMAnalyzer
 
 # ---------------------------------------------------------------------------
 # Color scheme (same as static dashboard)
@@ -44,41 +53,43 @@ COLORS = {
 # ---------------------------------------------------------------------------
 # Functions ported from gtm_dashboard_static.py
 # ---------------------------------------------------------------------------
+_VAR_TYPE_NAMES = {
+    "v": "Data Layer Variable",
+    "k": "Cookie",
+    "u": "URL",
+    "f": "Referrer",
+    "e": "Event",
+    "j": "JavaScript Variable",
+    "jsm": "Custom JavaScript",
+    "d": "DOM Element",
+    "c": "Constant",
+    "gas": "Google Analytics Settings",
+    "r": "Random Number",
+    "aev": "Auto-Event Variable",
+    "vis": "Element Visibility",
+    "ctv": "Container Version",
+    "dbg": "Debug Mode",
+    "cid": "Container ID",
+    "hid": "HTML ID",
+    "smm": "Lookup Table",
+    "remm": "Regex Table",
+    "ed": "Event Data",
+    "t": "Environment Name",
+    "awec": "User Provided Data",
+    "uv": "Undefined Value",
+    "fs": "Firestore Lookup",
+    "rh": "Request Header",
+    "sgtmk": "Request - Cookie Value",
+}
+
+
 def get_variable_type_name(var_type: str) -> str:
-    type_names = {
-        "v": "Data Layer Variable",
-        "k": "Cookie",
-        "u": "URL",
-        "f": "Referrer",
-        "e": "Event",
-        "j": "JavaScript Variable",
-        "jsm": "Custom JavaScript",
-        "d": "DOM Element",
-        "c": "Constant",
-        "gas": "Google Analytics Settings",
-        "r": "Random Number",
-        "aev": "Auto-Event Variable",
-        "vis": "Element Visibility",
-        "ctv": "Container Version",
-        "dbg": "Debug Mode",
-        "cid": "Container ID",
-        "hid": "HTML ID",
-        "smm": "Lookup Table",
-        "remm": "Regex Table",
-        "ed": "Event Data",
-        "t": "Environment Name",
-        "awec": "User Provided Data",
-        "uv": "Undefined Value",
-        "fs": "Firestore Lookup",
-        "rh": "Request Header",
-        "sgtmk": "Request - Cookie Value",
-    }
     if var_type.startswith("cvt_"):
         return "Custom Template Variable"
-    return type_names.get(var_type, f"Unknown ({var_type})")
+    return _VAR_TYPE_NAMES.get(var_type, f"Unknown ({var_type})")
 
 
-_BUILTIN_NAMES = {
+_BUILTIN_NAMES = frozenset({
     "Event Name", "Page URL", "Page Hostname", "Page Path", "Referrer",
     "Click Element", "Click Classes", "Click ID", "Click URL", "Click Text",
     "Container ID", "Container Version", "Debug Mode", "Random Number",
@@ -93,7 +104,7 @@ _BUILTIN_NAMES = {
     "Scroll Direction", "Element Visibility Ratio", "Element Visibility Time",
     "Element Visibility First Time", "Element Visibility Recent Time",
     "Percent Visible", "On Screen Duration",
-}
+})
 
 
 def get_variable_type_for_name(var_name: str, usage_data: dict) -> str:
@@ -112,22 +123,26 @@ def prepare_variable_impact_data(data: dict) -> pd.DataFrame:
     tag_data = data.get("tag_evaluation_impact", {})
     usage_counts = data.get("variable_usage_counts", {})
 
-    combined = {}
-    for var, count in trigger_data.get("evaluations_by_variable", {}).items():
-        combined[var] = {"triggers": count, "tags": 0, "total_evaluations": count, "locations": 0, "type": "Unknown"}
-    for var, count in tag_data.get("evaluations_by_variable", {}).items():
-        if var in combined:
-            combined[var]["tags"] = count
-            combined[var]["total_evaluations"] += count
-        else:
-            combined[var] = {"triggers": 0, "tags": count, "total_evaluations": count, "locations": 0, "type": "Unknown"}
-    for var in combined:
-        if var in usage_counts:
-            combined[var]["locations"] = usage_counts[var].get("evaluation_contexts", 0)
-        combined[var]["type"] = get_variable_type_for_name(var, usage_counts)
-
-    df = pd.DataFrame.from_dict(combined, orient="index").reset_index()
-    df.columns = ["Variable", "Trigger Evals", "Tag Evals", "Total Evals", "Locations", "Type"]
+    triggers = pd.Series(trigger_data.get("evaluations_by_variable", {}), name="Trigger Evals", dtype="int64")
+    tags = pd.Series(tag_data.get("evaluations_by_variable", {}), name="Tag Evals", dtype="int64")
+    df = pd.concat([triggers, tags], axis=1).fillna(0).astype("int64")
+    df["Total Evals"] = df["Trigger Evals"] + df["Tag Evals"]
+
+    # Same lookup order as get_variable_type_for_name, one column at a time
+    names = df.index.to_series().astype(str)
+    locations = {var: info.get("evaluation_contexts", 0) for var, info in usage_counts.items()}
+    types = {
+        var: get_variable_type_name(info.get("variable", {}).get("type", "Unknown"))
+        for var, info in usage_counts.items()
+    }
+    fallback = np.where(
+        names.str.startswith("_"), "GTM Internal Variable",
+        np.where(names.isin(_BUILTIN_NAMES), "Built-in Variable", "Unknown"),
+    )
+    df["Locations"] = names.map(locations).fillna(0).astype("int64")
+    df["Type"] = names.map(types).fillna(pd.Series(fallback, index=df.index))
+
+    df = df.rename_axis("Variable").reset_index()
     return df.sort_values("Total Evals", ascending=False)
 
 
@@ -179,11 +194,12 @@ def create_improvement_recommendations(data: dict) -> list:
     dup_items = []
     total_dup = 0
     for dup_type, groups in duplicates.items():
+        if not groups:
+            continue
+        clean_type = dup_type.replace("_duplicates", "").replace("_", " ").title()
         for group in groups:
             total_dup += len(group)
-            names = [v["name"] for v in group]
-            clean_type = dup_type.replace("_duplicates", "").replace("_", " ").title()
-            dup_items.append(f"{clean_type}: {', '.join(names)}")
+            dup_items.append(f"{clean_type}: {', '.join(v['name'] for v in group)}")
     if dup_items:
         recommendations.append({
             "priority": "MEDIUM", "category": "Consolidation",
@@ -196,12 +212,13 @@ def create_improvement_recommendations(data: dict) -> list:
     # High re-evaluation
     trigger_data = data.get("trigger_evaluation_impact", {})
     tag_data = data.get("tag_evaluation_impact", {})
-    all_evals = {}
-    for var, count in trigger_data.get("evaluations_by_variable", {}).items():
-        all_evals[var] = count
-    for var, count in tag_data.get("evaluations_by_variable", {}).items():
-        all_evals[var] = all_evals.get(var, 0) + count
-    high_eval = sorted([(v, c) for v, c in all_evals.items() if c > 100], key=lambda x: x[1], reverse=True)
+    all_evals = (Counter(trigger_data.get("evaluations_by_variable", {}))
+                 + Counter(tag_data.get("evaluations_by_variable", {})))
+    high_eval = []
+    for v, c in all_evals.most_common():
+        if c <= 100:
+            break
+        high_eval.append((v, c))
     if high_eval:
         items = [f"{v} ({c} evaluations)" for v, c in high_eval[:20]]
         if len(high_eval) > 20:
@@ -233,10 +250,11 @@ def create_improvement_recommendations(data: dict) -> list:
 # Run analysis
 # ---------------------------------------------------------------------------
 @st.cache_data(show_spinner="Running GTM analysis...")
-def run_analysis(file_bytes: bytes, include_paused: bool) -> dict:
-    gtm_data = json.loads(file_bytes)
-    mod = _load_analyzer_module()
-    analyzer = mod.GTMAnalyzer(gtm_data, include_paused_tags=include_paused)
+def run_analysis(digest: str, include_paused: bool, _gtm_data: dict) -> dict:
+    # Keyed on the upload's SHA-256 digest; the underscore keeps Streamlit
+    # from hashing the parsed container on every call
+    analyzer_cls = _load_analyzer()
+    analyzer = analyzer_cls(_gtm_data, include_paused_tags=include_paused)
     report = analyzer.generate_detailed_report()
     trigger_impact = analyzer.analyze_trigger_evaluation_impact()
     tag_impact = analyzer.analyze_tag_evaluation_impact()
@@ -245,15 +263,106 @@ def run_analysis(file_bytes: bytes, include_paused: bool) -> dict:
     return report
 
 
+@st.cache_data(show_spinner=False)
+def _report_json_bytes(digest: str, _data: dict) -> bytes:
+    """Serialize the report for download once per analysis instead of on every rerun."""
+    if orjson is not None:
+        return orjson.dumps(_data, option=orjson.OPT_INDENT_2)
+    return json.dumps(_data, indent=2).encode("utf-8")
+
+
+# Pure functions of the report, cached on its digest so widget reruns reuse them
+@st.cache_data(show_spinner=False)
+def _health_score(digest: str, _data: dict) -> float:
+    return calculate_health_score(_data)
+
+
+@st.cache_data(show_spinner=False)
+def _recommendations(digest: str, _data: dict) -> list:
+    return create_improvement_recommendations(_data)
+
+
+@st.cache_data(show_spinner=False)
+def _impact_df(digest: str, _data: dict) -> pd.DataFrame:
+    return prepare_variable_impact_data(_data)
+
+
+# Figures are built once per report and reused on reruns
+@st.cache_data(show_spinner=False)
+def _gauge_fig(digest: str, health_score: float) -> go.Figure:
+    bar_color = COLORS["success"] if health_score >= 80 else COLORS["warning"] if health_score >= 60 else COLORS["danger"]
+    fig_gauge = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=health_score,
+        title={"text": "Container Health Score"},
+        gauge={
+            "axis": {"range": [0, 100]},
+            "bar": {"color": bar_color},
+            "steps": [
+                {"range": [0, 60], "color": "lightgray"},
+                {"range": [60, 80], "color": "gray"},
+            ],
+            "threshold": {"line": {"color": "red", "width": 4}, "thickness": 0.75, "value": 90},
+        },
+    ))
+    fig_gauge.update_layout(height=300, paper_bgcolor="rgba(0,0,0,0)")
+    return fig_gauge
+
+
+@st.cache_data(show_spinner=False)
+def _impact_fig(digest: str, _df_impact: pd.DataFrame) -> go.Figure:
+    df_top20 = _df_impact.head(20)
+    fig_impact = px.bar(
+        df_top20, x="Variable", y=["Trigger Evals", "Tag Evals"],
+        title="Top 20 Variables by Evaluation Impact",
+        labels={"value": "Evaluations", "Variable": "Variable Name"},
+        color_discrete_map={"Trigger Evals": COLORS["primary"], "Tag Evals": COLORS["warning"]},
+    )
+    fig_impact.update_xaxes(categoryorder="array", categoryarray=df_top20["Variable"].to_numpy())
+    fig_impact.update_layout(
+        xaxis_tickangle=-45, height=500,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+    )
+    return fig_impact
+
+
+@st.cache_data(show_spinner=False)
+def _usage_fig(digest: str, used: int, unused: int) -> go.Figure:
+    fig_usage = go.Figure(data=[go.Pie(
+        labels=["Used Variables", "Unused Variables"],
+        values=[used, unused], hole=0.3,
+        marker_colors=[COLORS["success"], COLORS["danger"]],
+    )])
+    fig_usage.update_layout(title="Variable Usage Status", paper_bgcolor="rgba(0,0,0,0)")
+    return fig_usage
+
+
+@st.cache_data(show_spinner=False)
+def _types_fig(digest: str, _df_impact: pd.DataFrame) -> go.Figure:
+    # Keep the pie to the largest types so the trace stays small on big containers
+    type_counts = _df_impact["Type"].value_counts()
+    other = type_counts.iloc[8:].sum()
+    if other:
+        type_counts = pd.concat([type_counts.head(8), pd.Series({"Other": other})])
+    fig_types = px.pie(values=type_counts.values, names=type_counts.index, title="Variable Distribution by Type")
+    fig_types.update_layout(paper_bgcolor="rgba(0,0,0,0)")
+    return fig_types
+
+
 # ---------------------------------------------------------------------------
 # Dashboard rendering
 # ---------------------------------------------------------------------------
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_JS_ESCAPE_TABLE = str.maketrans({"\\": "\\\\", "'": "\\'", '"': '\\"'})
+
+
 def _esc_html(text: str) -> str:
-    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text.translate(_HTML_ESCAPE_TABLE)
 
 
 def _esc_js(text: str) -> str:
-    return text.replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"')
+    return text.translate(_JS_ESCAPE_TABLE)
 
 
 # JavaScript for clipboard copy — runs inside st.html() auto-sizing iframe
@@ -297,6 +406,15 @@ def _render_copyable_html(body_html: str):
     st.html(page)
 
 
+def _details_html(summary: str, body_html: str) -> str:
+    """Collapsible block (open by default) so related sections share one st.html render."""
+    return (
+        '<details open style="border:1px solid #e6e9ef;border-radius:6px;padding:6px 10px;margin-bottom:8px;">'
+        f'<summary style="cursor:pointer;font-weight:600;">{_esc_html(summary)}</summary>'
+        f'{body_html}</details>'
+    )
+
+
 def _copy_span(name: str) -> str:
     """Render a variable name with an inline copy-to-clipboard icon."""
     h = _esc_html(name)
@@ -310,19 +428,23 @@ def _copy_span(name: str) -> str:
     )
 
 
+# Recommendation item shapes recognised by _make_copyable_item
+_RE_ID = re.compile(r'^(.+?)\s*\(ID:\s*')
+_RE_COLON_LIST = re.compile(r'^([^:]+):\s*(.+)$')
+_RE_EVALS = re.compile(r'^(.+?)\s*\(\d+\s+evaluations?\)')
+
+
 def _make_copyable_item(item_text: str) -> str:
     """Convert a recommendation list item to HTML with copy icons next to variable names."""
-    import re as _re
-
     # Pattern: "VarName (ID: 123, Type: v)" — unused vars / templates
-    m = _re.match(r'^(.+?)\s*\(ID:\s*', item_text)
+    m = _RE_ID.match(item_text)
     if m:
         name = m.group(1).strip()
         rest = _esc_html(item_text[len(name):])
         return f"<li>{_copy_span(name)}{rest}</li>"
 
     # Pattern: "Type: name1, name2, name3" — duplicate groups
-    m = _re.match(r'^([^:]+):\s*(.+)$', item_text)
+    m = _RE_COLON_LIST.match(item_text)
     if m and ", " in m.group(2):
         prefix = _esc_html(m.group(1))
         names = [n.strip() for n in m.group(2).split(",")]
@@ -330,7 +452,7 @@ def _make_copyable_item(item_text: str) -> str:
         return f"<li>{prefix}: {names_html}</li>"
 
     # Pattern: "name (N evaluations)" — high-impact vars
-    m = _re.match(r'^(.+?)\s*\(\d+\s+evaluations?\)', item_text)
+    m = _RE_EVALS.match(item_text)
     if m:
         name = m.group(1).strip()
         rest = _esc_html(item_text[len(name):])
@@ -340,7 +462,7 @@ def _make_copyable_item(item_text: str) -> str:
     return f"<li>{_esc_html(item_text)}</li>"
 
 
-def render_dashboard(data: dict):
+def render_dashboard(data: dict, digest: str):
     summary = data.get("summary", {})
     trigger_impact = data.get("trigger_evaluation_impact", {})
     tag_impact = data.get("tag_evaluation_impact", {})
@@ -361,76 +483,41 @@ def render_dashboard(data: dict):
     extra[3].metric("Built-in Variables", summary.get("total_builtin_variables", 0))
 
     # ---- Health score gauge ----
-    health_score = calculate_health_score(data)
-    bar_color = COLORS["success"] if health_score >= 80 else COLORS["warning"] if health_score >= 60 else COLORS["danger"]
-    fig_gauge = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=health_score,
-        title={"text": "Container Health Score"},
-        gauge={
-            "axis": {"range": [0, 100]},
-            "bar": {"color": bar_color},
-            "steps": [
-                {"range": [0, 60], "color": "lightgray"},
-                {"range": [60, 80], "color": "gray"},
-            ],
-            "threshold": {"line": {"color": "red", "width": 4}, "thickness": 0.75, "value": 90},
-        },
-    ))
-    fig_gauge.update_layout(height=300, paper_bgcolor="rgba(0,0,0,0)")
-    st.plotly_chart(fig_gauge, width="stretch")
+    health_score = _health_score(digest, data)
+    st.plotly_chart(_gauge_fig(digest, health_score), width="stretch")
 
     # ---- Recommendations ----
-    recommendations = create_improvement_recommendations(data)
+    recommendations = _recommendations(digest, data)
     if recommendations:
         st.markdown("## Container Improvement Guide")
+        sections = []
         for rec in recommendations:
             icon = {"HIGH": "\U0001f534", "MEDIUM": "\U0001f7e0", "LOW": "\U0001f535"}[rec["priority"]]
-            with st.expander(f"{icon} [{rec['priority']}] {rec['title']} \u2014 {rec['impact']}", expanded=True):
-                st.write(rec.get("action", ""))
-                items_html = "<ul style='padding-left:20px;'>" + "".join(
-                    _make_copyable_item(item) for item in rec["items"]
-                ) + "</ul>"
-                _render_copyable_html(items_html)
+            items_html = "<ul style='padding-left:20px;'>" + "".join(
+                _make_copyable_item(item) for item in rec["items"]
+            ) + "</ul>"
+            sections.append(_details_html(
+                f"{icon} [{rec['priority']}] {rec['title']} \u2014 {rec['impact']}",
+                f"<p>{_esc_html(rec.get('action', ''))}</p>{items_html}",
+            ))
+        _render_copyable_html("".join(sections))
 
     # ---- Charts ----
     st.markdown("## Variable Evaluation Impact")
-    df_impact = prepare_variable_impact_data(data)
+    df_impact = _impact_df(digest, data)
 
     # Top 20 bar chart
-    df_top20 = df_impact.head(20)
-    fig_impact = px.bar(
-        df_top20, x="Variable", y=["Trigger Evals", "Tag Evals"],
-        title="Top 20 Variables by Evaluation Impact",
-        labels={"value": "Evaluations", "Variable": "Variable Name"},
-        color_discrete_map={"Trigger Evals": COLORS["primary"], "Tag Evals": COLORS["warning"]},
-    )
-    fig_impact.update_xaxes(categoryorder="array", categoryarray=df_top20["Variable"].tolist())
-    fig_impact.update_layout(
-        xaxis_tickangle=-45, height=500,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
-    )
-    st.plotly_chart(fig_impact, width="stretch")
+    st.plotly_chart(_impact_fig(digest, df_impact), width="stretch")
 
     # Pie charts side-by-side
     col_a, col_b = st.columns(2)
     with col_a:
         used = summary.get("total_variables", 0) - summary.get("unused_variables", 0)
         unused = summary.get("unused_variables", 0)
-        fig_usage = go.Figure(data=[go.Pie(
-            labels=["Used Variables", "Unused Variables"],
-            values=[used, unused], hole=0.3,
-            marker_colors=[COLORS["success"], COLORS["danger"]],
-        )])
-        fig_usage.update_layout(title="Variable Usage Status", paper_bgcolor="rgba(0,0,0,0)")
-        st.plotly_chart(fig_usage, width="stretch")
+        st.plotly_chart(_usage_fig(digest, used, unused), width="stretch")
 
     with col_b:
-        type_counts = df_impact["Type"].value_counts()
-        fig_types = px.pie(values=type_counts.values, names=type_counts.index, title="Variable Distribution by Type")
-        fig_types.update_layout(paper_bgcolor="rgba(0,0,0,0)")
-        st.plotly_chart(fig_types, width="stretch")
+        st.plotly_chart(_types_fig(digest, df_impact), width="stretch")
 
     # ---- Tag type statistics ----
     tag_stats = tag_impact.get("tag_type_statistics", {})
@@ -453,15 +540,12 @@ def render_dashboard(data: dict):
     st.markdown("## High Impact Variables")
     df_table = df_impact.head(30)
 
-    def color_evals(val):
-        if isinstance(val, (int, float)):
-            if val > 1000:
-                return "background-color: #f8d7da"
-            if val > 500:
-                return "background-color: #fff3cd"
-        return ""
+    def color_evals(col):
+        vals = col.to_numpy()
+        return np.where(vals > 1000, "background-color: #f8d7da",
+                        np.where(vals > 500, "background-color: #fff3cd", ""))
 
-    styled = df_table.style.map(color_evals, subset=["Total Evals"])
+    styled = df_table.style.apply(color_evals, subset=["Total Evals"])
     st.dataframe(styled, hide_index=True, width="stretch")
 
     # ---- Unused variables detail ----
@@ -469,62 +553,71 @@ def render_dashboard(data: dict):
     if unused_vars:
         st.markdown("## Unused Variables Detail")
         # Build HTML table with copy icons next to variable names
-        tbl = (
+        cells = [
+            (
+                _copy_span(v["name"]),
+                _esc_html(str(v.get("variableId", ""))),
+                _esc_html(get_variable_type_name(v.get("type", ""))),
+            )
+            for v in unused_vars
+        ]
+        body = "".join(
+            f'<tr style="border-bottom:1px solid #eee;">'
+            f'<td style="padding:6px;">{name}</td>'
+            f'<td style="padding:6px;">{var_id}</td>'
+            f'<td style="padding:6px;">{type_name}</td>'
+            f'</tr>'
+            for name, var_id, type_name in cells
+        )
+        _render_copyable_html(
             '<table style="width:100%;border-collapse:collapse;font-size:0.9em;">'
             '<thead><tr style="border-bottom:2px solid #ddd;text-align:left;">'
             '<th style="padding:6px;">Name</th>'
             '<th style="padding:6px;">Variable ID</th>'
             '<th style="padding:6px;">Type</th>'
-            '</tr></thead><tbody>'
+            f'</tr></thead><tbody>{body}</tbody></table>'
         )
-        for v in unused_vars:
-            type_name = get_variable_type_name(v.get("type", ""))
-            tbl += (
-                f'<tr style="border-bottom:1px solid #eee;">'
-                f'<td style="padding:6px;">{_copy_span(v["name"])}</td>'
-                f'<td style="padding:6px;">{_esc_html(str(v.get("variableId", "")))}</td>'
-                f'<td style="padding:6px;">{_esc_html(type_name)}</td>'
-                f'</tr>'
-            )
-        tbl += '</tbody></table>'
-        _render_copyable_html(tbl)
 
     # ---- Duplicate variables detail ----
     duplicates = data.get("duplicate_variables", {})
     has_dups = any(groups for groups in duplicates.values())
     if has_dups:
         st.markdown("## Duplicate Variables Detail")
+        sections = []
         for dup_type, groups in duplicates.items():
             if not groups:
                 continue
             clean_type = dup_type.replace("_duplicates", "").replace("_", " ").title()
             for i, group in enumerate(groups, 1):
-                with st.expander(f"{clean_type} \u2014 Group {i}: {', '.join(v['name'] for v in group)}", expanded=True):
-                    # Build HTML table with copy icons
-                    cols = [k for k in group[0].keys() if k != "formatValue"]
-                    header = "".join(f'<th style="padding:6px;text-align:left;">{_esc_html(c)}</th>' for c in cols)
-                    rows = ""
-                    for v in group:
-                        cells = ""
-                        for c in cols:
-                            val = v.get(c, "")
-                            if c == "name":
-                                cells += f'<td style="padding:6px;">{_copy_span(str(val))}</td>'
-                            else:
-                                cells += f'<td style="padding:6px;">{_esc_html(str(val))}</td>'
-                        rows += f'<tr style="border-bottom:1px solid #eee;">{cells}</tr>'
-                    tbl = (
-                        f'<table style="width:100%;border-collapse:collapse;font-size:0.9em;">'
-                        f'<thead><tr style="border-bottom:2px solid #ddd;">{header}</tr></thead>'
-                        f'<tbody>{rows}</tbody></table>'
+                # Build HTML table with copy icons
+                cols = [k for k in group[0].keys() if k != "formatValue"]
+                header = "".join(f'<th style="padding:6px;text-align:left;">{_esc_html(c)}</th>' for c in cols)
+                rows = "".join(
+                    '<tr style="border-bottom:1px solid #eee;">'
+                    + "".join(
+                        f'<td style="padding:6px;">{_copy_span(str(v.get(c, "")))}</td>' if c == "name"
+                        else f'<td style="padding:6px;">{_esc_html(str(v.get(c, "")))}</td>'
+                        for c in cols
                     )
-                    _render_copyable_html(tbl)
+                    + '</tr>'
+                    for v in group
+                )
+                tbl = (
+                    f'<table style="width:100%;border-collapse:collapse;font-size:0.9em;">'
+                    f'<thead><tr style="border-bottom:2px solid #ddd;">{header}</tr></thead>'
+                    f'<tbody>{rows}</tbody></table>'
+                )
+                sections.append(_details_html(
+                    f"{clean_type} \u2014 Group {i}: {', '.join(v['name'] for v in group)}", tbl
+                ))
+        _render_copyable_html("".join(sections))
 
     # ---- Download JSON report ----
     st.markdown("---")
+    # Serialized only when the button is actually clicked
     st.download_button(
         label="Download Full Analysis Report (JSON)",
-        data=json.dumps(data, indent=2),
+        data=lambda: _report_json_bytes(digest, data),
         file_name="gtm_analysis_report.json",
         mime="application/json",
     )
@@ -556,21 +649,28 @@ def main():
 
     file_bytes = uploaded.getvalue()
 
-    # Quick JSON sanity check
-    try:
-        preview = json.loads(file_bytes)
-        if "containerVersion" not in preview:
-            st.warning("This JSON does not appear to contain a `containerVersion` key. It may not be a valid GTM export.")
-    except json.JSONDecodeError as exc:
-        st.error(f"Invalid JSON file: {exc}")
-        return
+    # Quick JSON sanity check, parsed and hashed once per upload rather than per rerun
+    if st.session_state.get("upload_id") != uploaded.file_id:
+        try:
+            preview = orjson.loads(file_bytes) if orjson is not None else json.loads(file_bytes)
+        except json.JSONDecodeError as exc:
+            st.error(f"Invalid JSON file: {exc}")
+            return
+        st.session_state["upload_id"] = uploaded.file_id
+        st.session_state["digest"] = hashlib.sha256(file_bytes).hexdigest()
+        st.session_state["gtm_data"] = preview
+    if "containerVersion" not in st.session_state["gtm_data"]:
+        st.warning("This JSON does not appear to contain a `containerVersion` key. It may not be a valid GTM export.")
 
     # ---- Step 2: Run Analysis ----
     st.markdown("### Step 2: Run Analysis")
     run_clicked = st.button("Run Analysis", type="primary")
 
     if run_clicked:
-        st.session_state["report"] = run_analysis(file_bytes, include_paused)
+        st.session_state["report"] = run_analysis(
+            st.session_state["digest"], include_paused, _gtm_data=st.session_state["gtm_data"]
+        )
+        st.session_state["report_digest"] = f"{st.session_state['digest']}:{include_paused}"
 
     if "report" not in st.session_state:
         st.info("Click **Run Analysis** to start.")
@@ -578,7 +678,7 @@ def main():
 
     # ---- Step 3: Dashboard ----
     st.markdown("---")
-    render_dashboard(st.session_state["report"])
+    render_dashboard(st.session_state["report"], st.session_state["report_digest"])
 
 
 if __name__ == "__main__":
@@ -5,19 +5,36 @@ Creates nodes and relationships for graph database import
 """
 
 import json
+import os
+import re
 import sys
-import hashlib
+import zlib
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+@lru_cache(maxsize=None)
 def generate_id(prefix, name):
     """Generate a unique ID for a node"""
-    return f"{prefix}_{hashlib.md5(name.encode()).hexdigest()[:8]}"
+    # CRC32 gives the same 8 hex digits as the old truncated MD5 at a fraction of the cost
+    return f"{prefix}_{zlib.crc32(name.encode()):08x}"
 
-def create_neo4j_dataset(analysis_data):
-    """Convert GTM analysis data to Neo4j format"""
-    nodes = []
-    relationships = []
-    
+# usage_components key -> (ID prefix, node label, USES_VARIABLE usage_type)
+_COMPONENT_TABLE = (
+    ("tags", "tag", "Tag", "direct"),
+    ("triggers", "trigger", "Trigger", "condition"),
+    ("clients", "client", "Client", "parameter"),
+    ("transformations", "trans", "Transformation", "transform"),
+    ("custom_templates", "template", "CustomTemplate", "template_code"),
+)
+
+def _iter_graph_records(analysis_data):
+    """Yield ("node", node) and ("relationship", rel) records; nodes are deduplicated here"""
     # Track processed nodes to avoid duplicates
     processed_nodes = set()
     
@@ -28,7 +45,7 @@ def create_neo4j_dataset(analysis_data):
     
     # Container metadata node
     container_id = "container_main"
-    nodes.append({
+    yield "node", {
         "id": container_id,
         "labels": ["Container"],
         "properties": {
@@ -39,7 +56,7 @@ def create_neo4j_dataset(analysis_data):
             "total_triggers": summary.get('total_triggers', 0),
             "health_score": 100 - summary.get('unused_variables', 0) - (summary.get('duplicate_groups', 0) * 2)
         }
-    })
+    }
     
     # Process variables and their usage
     for var_name, var_data in usage_counts.items():
@@ -56,145 +73,64 @@ def create_neo4j_dataset(analysis_data):
             else:
                 var_category = get_variable_category(var_type)
             
-            nodes.append({
+            # Interned so the handful of category labels are shared across all variable nodes
+            labels = ["Variable", sys.intern(var_category.replace(' ', ''))]
+            total_references = var_data.get('total_references', 0)
+            if total_references == 0:
+                labels.append("UnusedVariable")
+            
+            yield "node", {
                 "id": var_id,
-                "labels": ["Variable", var_category.replace(' ', '')],
+                "labels": labels,
                 "properties": {
                     "name": var_name,
                     "type": var_type,
                     "category": var_category,
-                    "total_references": var_data.get('total_references', 0),
+                    "total_references": total_references,
                     "evaluation_contexts": var_data.get('evaluation_contexts', 0),
-                    "is_used": var_data.get('total_references', 0) > 0
+                    "is_used": total_references > 0
                 }
-            })
+            }
             processed_nodes.add(var_id)
         
         # Create relationships to components using this variable
         components = var_data.get('usage_components', {})
         
-        # Tags
-        for tag_name in components.get('tags', []):
-            tag_id = generate_id("tag", tag_name)
-            if tag_id not in processed_nodes:
-                nodes.append({
-                    "id": tag_id,
-                    "labels": ["Tag"],
-                    "properties": {
-                        "name": tag_name
+        # Tags, triggers and SGTM components all point at the variable the same way
+        for comp_key, prefix, label, usage_type in _COMPONENT_TABLE:
+            for comp_name in components.get(comp_key, ()):
+                comp_id = generate_id(prefix, comp_name)
+                if comp_id not in processed_nodes:
+                    yield "node", {
+                        "id": comp_id,
+                        "labels": [label],
+                        "properties": {
+                            "name": comp_name
+                        }
                     }
-                })
-                processed_nodes.add(tag_id)
-            
-            relationships.append({
-                "type": "USES_VARIABLE",
-                "startNode": tag_id,
-                "endNode": var_id,
-                "properties": {
-                    "usage_type": "direct"
-                }
-            })
-        
-        # Triggers
-        for trigger_name in components.get('triggers', []):
-            trigger_id = generate_id("trigger", trigger_name)
-            if trigger_id not in processed_nodes:
-                nodes.append({
-                    "id": trigger_id,
-                    "labels": ["Trigger"],
+                    processed_nodes.add(comp_id)
+                
+                yield "relationship", {
+                    "type": "USES_VARIABLE",
+                    "startNode": comp_id,
+                    "endNode": var_id,
                     "properties": {
-                        "name": trigger_name
+                        "usage_type": usage_type
                     }
-                })
-                processed_nodes.add(trigger_id)
-            
-            relationships.append({
-                "type": "USES_VARIABLE",
-                "startNode": trigger_id,
-                "endNode": var_id,
-                "properties": {
-                    "usage_type": "condition"
                 }
-            })
         
         # Variables (variable-to-variable dependencies)
-        for ref_var_name in components.get('variables', []):
-            ref_var_id = generate_id("var", ref_var_name)
+        for ref_name in components.get('variables', []):
+            ref_var_id = generate_id("var", ref_name)
             if ref_var_id != var_id:  # Avoid self-references
-                relationships.append({
+                yield "relationship", {
                     "type": "REFERENCES_VARIABLE",
                     "startNode": ref_var_id,
                     "endNode": var_id,
                     "properties": {
                         "reference_type": "nested"
                     }
-                })
-        
-        # Clients (SGTM)
-        for client_name in components.get('clients', []):
-            client_id = generate_id("client", client_name)
-            if client_id not in processed_nodes:
-                nodes.append({
-                    "id": client_id,
-                    "labels": ["Client"],
-                    "properties": {
-                        "name": client_name
-                    }
-                })
-                processed_nodes.add(client_id)
-            
-            relationships.append({
-                "type": "USES_VARIABLE",
-                "startNode": client_id,
-                "endNode": var_id,
-                "properties": {
-                    "usage_type": "parameter"
                 }
-            })
-        
-        # Transformations (SGTM)
-        for trans_name in components.get('transformations', []):
-            trans_id = generate_id("trans", trans_name)
-            if trans_id not in processed_nodes:
-                nodes.append({
-                    "id": trans_id,
-                    "labels": ["Transformation"],
-                    "properties": {
-                        "name": trans_name
-                    }
-                })
-                processed_nodes.add(trans_id)
-            
-            relationships.append({
-                "type": "USES_VARIABLE",
-                "startNode": trans_id,
-                "endNode": var_id,
-                "properties": {
-                    "usage_type": "transform"
-                }
-            })
-        
-        # Custom Templates
-        for template_name in components.get('custom_templates', []):
-            template_id = generate_id("template", template_name)
-            if template_id not in processed_nodes:
-                nodes.append({
-                    "id": template_id,
-                    "labels": ["CustomTemplate"],
-                    "properties": {
-                        "name": template_name
-                    }
-                })
-                processed_nodes.add(template_id)
-            
-            relationships.append({
-                "type": "USES_VARIABLE",
-                "startNode": template_id,
-                "endNode": var_id,
-                "properties": {
-                    "usage_type": "template_code"
-                }
-            })
     
     # Process trigger-to-tag relationships from evaluation impact data
     trigger_impact = analysis_data.get('trigger_evaluation_impact', {})
@@ -204,26 +140,25 @@ def create_neo4j_dataset(analysis_data):
             trigger_id = generate_id("trigger", trigger_name)
             
             for tag_info in trigger_detail.get('attached_tags', []):
-                tag_name = tag_info.get('name', 'Unknown Tag')
-                tag_id = generate_id("tag", tag_name)
-                
-                relationships.append({
+                yield "relationship", {
                     "type": "FIRES_TAG",
                     "startNode": trigger_id,
-                    "endNode": tag_id,
+                    "endNode": generate_id("tag", tag_info.get('name', 'Unknown Tag')),
                     "properties": {
                         "tag_type": tag_info.get('type', 'Unknown')
                     }
-                })
+                }
     
-    # Process unused variables
+    # Unused variables missing from the usage counts; the rest were labelled above
     for unused_var in analysis_data.get('unused_variables', []):
         var_name = unused_var['name']
+        if var_name in usage_counts:
+            continue
         var_id = generate_id("var", var_name)
         
         if var_id not in processed_nodes:
             var_type = unused_var.get('type', 'unknown')
-            nodes.append({
+            yield "node", {
                 "id": var_id,
                 "labels": ["Variable", "UnusedVariable"],
                 "properties": {
@@ -234,7 +169,7 @@ def create_neo4j_dataset(analysis_data):
                     "is_used": False,
                     "variable_id": unused_var.get('variableId', '')
                 }
-            })
+            }
             processed_nodes.add(var_id)
     
     # Process duplicate variables
@@ -245,25 +180,51 @@ def create_neo4j_dataset(analysis_data):
             dup_group_id += 1
             group_node_id = f"dupgroup_{dup_group_id}"
             
-            nodes.append({
+            yield "node", {
                 "id": group_node_id,
                 "labels": ["DuplicateGroup"],
                 "properties": {
                     "type": dup_type,
                     "size": len(group)
                 }
-            })
+            }
             
             for dup_var in group:
-                var_id = generate_id("var", dup_var['name'])
-                relationships.append({
+                yield "relationship", {
                     "type": "DUPLICATE_OF",
-                    "startNode": var_id,
+                    "startNode": generate_id("var", dup_var['name']),
                     "endNode": group_node_id,
                     "properties": {
                         "duplicate_type": dup_type
                     }
-                })
+                }
+    
+
+def iter_graph(analysis_data):
+    """Yield the dataset as ("node", node) / ("relationship", rel) records
+    
+    Lets writers stream the graph without holding every node and relationship.
+    Each (type, startNode, endNode) edge is emitted only once.
+    """
+    rel_seen = set()
+    for kind, record in _iter_graph_records(analysis_data):
+        if kind == "relationship":
+            key = (record["type"], record["startNode"], record["endNode"])
+            if key in rel_seen:
+                continue
+            rel_seen.add(key)
+        yield kind, record
+
+def create_neo4j_dataset(analysis_data, include_cypher=True):
+    """Convert GTM analysis data to Neo4j format
+    
+    With include_cypher=False the "cypher_import" statements are not generated,
+    for callers that only need the raw graph.
+    """
+    nodes = []
+    relationships = []
+    for kind, record in iter_graph(analysis_data):
+        (nodes if kind == "node" else relationships).append(record)
     
     # Create Neo4j import format
     neo4j_data = {
@@ -275,135 +236,214 @@ def create_neo4j_dataset(analysis_data):
             "total_relationships": len(relationships),
             "node_types": count_node_types(nodes),
             "relationship_types": count_relationship_types(relationships)
-        },
-        "cypher_import": generate_cypher_commands(nodes, relationships)
+        }
     }
+    if include_cypher:
+        neo4j_data["cypher_import"] = generate_cypher_commands(nodes, relationships)
     
     return neo4j_data
 
+_VAR_CATEGORY_MAP = {
+    'v': 'Data Layer Variable',
+    'k': 'Cookie',
+    'u': 'URL Variable',
+    'f': 'Referrer',
+    'e': 'Event',
+    'j': 'JavaScript Variable',
+    'jsm': 'Custom JavaScript',
+    'd': 'DOM Element',
+    'c': 'Constant',
+    'gas': 'Google Analytics Settings',
+    'r': 'Random Number',
+    'aev': 'Auto-Event Variable',
+    'vis': 'Element Visibility',
+    'ctv': 'Container Version',
+    'dbg': 'Debug Mode',
+    'cid': 'Container ID',
+    'hid': 'HTML ID',
+    'smm': 'Lookup Table',
+    'remm': 'Regex Table',
+    'ed': 'Event Data',
+    't': 'Environment Name'
+}
+
 def get_variable_category(var_type):
     """Categorize variable by type"""
-    categories = {
-        'v': 'Data Layer Variable',
-        'k': 'Cookie',
-        'u': 'URL Variable',
-        'f': 'Referrer',
-        'e': 'Event',
-        'j': 'JavaScript Variable',
-        'jsm': 'Custom JavaScript',
-        'd': 'DOM Element',
-        'c': 'Constant',
-        'gas': 'Google Analytics Settings',
-        'r': 'Random Number',
-        'aev': 'Auto-Event Variable',
-        'vis': 'Element Visibility',
-        'ctv': 'Container Version',
-        'dbg': 'Debug Mode',
-        'cid': 'Container ID',
-        'hid': 'HTML ID',
-        'smm': 'Lookup Table',
-        'remm': 'Regex Table',
-        'ed': 'Event Data',
-        't': 'Environment Name'
-    }
-    
     if var_type.startswith('cvt_'):
         return 'Custom Template Variable'
     
-    return categories.get(var_type, 'Other Variable')
+    return _VAR_CATEGORY_MAP.get(var_type, 'Other Variable')
 
 def count_node_types(nodes):
     """Count nodes by label"""
-    counts = {}
-    for node in nodes:
-        for label in node['labels']:
-            counts[label] = counts.get(label, 0) + 1
-    return counts
+    return dict(Counter(label for node in nodes for label in node['labels']))
 
 def count_relationship_types(relationships):
     """Count relationships by type"""
-    counts = {}
-    for rel in relationships:
-        rel_type = rel['type']
-        counts[rel_type] = counts.get(rel_type, 0) + 1
-    return counts
+    return dict(Counter(rel['type'] for rel in relationships))
+
+def _cypher_name(name):
+    """Backtick-quote a label or relationship type unless it is a plain identifier"""
+    if re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', name):
+        return name
+    return "`" + name.replace("`", "``") + "`"
 
 def generate_cypher_commands(nodes, relationships):
-    """Generate Cypher commands for Neo4j import"""
-    commands = []
+    """Generate Cypher commands for Neo4j import
+    
+    Statements are parameterized UNWIND batches: pass this dataset's "nodes" and
+    "relationships" arrays as $nodes and $relationships.
+    """
+    label_sets = list(dict.fromkeys(tuple(node['labels']) for node in nodes))
+    primary_label = {node['id']: node['labels'][0] for node in nodes}
+    rel_groups = list(dict.fromkeys(
+        (rel['type'], primary_label[rel['startNode']], primary_label[rel['endNode']])
+        for rel in relationships
+        if rel['startNode'] in primary_label and rel['endNode'] in primary_label
+    ))
     
-    # Create constraint commands
-    commands.append("// Create constraints for better performance")
-    commands.append("CREATE CONSTRAINT IF NOT EXISTS FOR (n:Variable) REQUIRE n.id IS UNIQUE;")
-    commands.append("CREATE CONSTRAINT IF NOT EXISTS FOR (n:Tag) REQUIRE n.id IS UNIQUE;")
-    commands.append("CREATE CONSTRAINT IF NOT EXISTS FOR (n:Trigger) REQUIRE n.id IS UNIQUE;")
-    commands.append("CREATE CONSTRAINT IF NOT EXISTS FOR (n:Client) REQUIRE n.id IS UNIQUE;")
-    commands.append("CREATE CONSTRAINT IF NOT EXISTS FOR (n:Transformation) REQUIRE n.id IS UNIQUE;")
+    commands = ["// Create constraints for better performance"]
+    commands.extend(
+        f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{_cypher_name(label)}) REQUIRE n.id IS UNIQUE;"
+        for label in dict.fromkeys(labels[0] for labels in label_sets)
+    )
     commands.append("")
     
-    # Create nodes
-    commands.append("// Create nodes")
-    for node in nodes[:5]:  # Show first 5 as examples
-        labels = ':'.join(node['labels'])
-        props = json.dumps(node['properties'])
-        commands.append(f"CREATE (n:{labels} {props});")
-    commands.append("// ... more node creation commands")
+    # One statement per label combination instead of one per node
+    commands.append("// Create nodes (pass the nodes array as $nodes)")
+    commands.extend(
+        f"UNWIND $nodes AS n WITH n WHERE n.labels = {json.dumps(list(labels))} "
+        f"CREATE (x:{':'.join(_cypher_name(label) for label in labels)}) "
+        f"SET x = n.properties, x.id = n.id;"
+        for labels in label_sets
+    )
     commands.append("")
     
-    # Create relationships
-    commands.append("// Create relationships")
-    for rel in relationships[:5]:  # Show first 5 as examples
-        commands.append(
-            f"MATCH (a {{id: '{rel['startNode']}'}}), (b {{id: '{rel['endNode']}'}}) "
-            f"CREATE (a)-[:{rel['type']} {json.dumps(rel['properties'])}]->(b);"
-        )
-    commands.append("// ... more relationship creation commands")
+    # One statement per relationship type and endpoint labels, so both MATCHes use the id constraints
+    commands.append("// Create relationships (pass the relationships array as $relationships)")
+    commands.extend(
+        f"UNWIND $relationships AS r WITH r WHERE r.type = {json.dumps(rel_type)} "
+        f"MATCH (a:{_cypher_name(start)} {{id: r.startNode}}), (b:{_cypher_name(end)} {{id: r.endNode}}) "
+        f"CREATE (a)-[x:{_cypher_name(rel_type)}]->(b) SET x = r.properties;"
+        for rel_type, start, end in rel_groups
+    )
     
     return commands
 
+def _dump_line(obj):
+    """Serialize one JSONL record"""
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return json.dumps(obj).encode('utf-8') + b"\n"
+
+def write_jsonl_dataset(records, out_dir, bins=8):
+    """Stream iter_graph() records into nodes, binned relationships and metadata files
+    
+    Relationships are binned on their start node, so importers can load the
+    bins in parallel without two workers writing to the same start node.
+    Returns the metadata that was written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    
+    node_count = 0
+    node_types = Counter()
+    relationship_types = Counter()
+    node_file = open(os.path.join(out_dir, 'nodes.jsonl'), 'wb')
+    bin_files = [open(os.path.join(out_dir, f'rels_bin_{i}.jsonl'), 'wb') for i in range(bins)]
+    try:
+        for kind, record in records:
+            if kind == "node":
+                node_count += 1
+                node_types.update(record['labels'])
+                node_file.write(_dump_line(record))
+            else:
+                relationship_types[record['type']] += 1
+                bin_files[zlib.crc32(record['startNode'].encode()) % bins].write(_dump_line(record))
+    finally:
+        node_file.close()
+        for f in bin_files:
+            f.close()
+    
+    # One importer thread per relationship bin
+    metadata = {
+        "generated": datetime.now().isoformat(),
+        "total_nodes": node_count,
+        "total_relationships": sum(relationship_types.values()),
+        "node_types": dict(node_types),
+        "relationship_types": dict(relationship_types),
+        "threads": bins
+    }
+    with open(os.path.join(out_dir, 'metadata.json'), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+    
+    return metadata
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python gtm_to_neo4j.py <analysis_report.json>")
+        print("Usage: python gtm_to_neo4j.py <analysis_report.json> [--jsonl OUTPUT_DIR]")
         sys.exit(1)
     
     input_file = sys.argv[1]
     output_file = "output2.json"
+    jsonl_dir = None
+    if '--jsonl' in sys.argv[2:]:
+        index = sys.argv.index('--jsonl', 2)
+        if index + 1 >= len(sys.argv):
+            print("Error: --jsonl requires an output directory")
+            sys.exit(1)
+        jsonl_dir = sys.argv[index + 1]
     
     # Load analysis report
     print(f"Loading analysis report from {input_file}...")
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            analysis_data = json.load(f)
+        with open(input_file, 'rb') as f:
+            raw = f.read()
+        analysis_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     except Exception as e:
         print(f"Error loading file: {e}")
         sys.exit(1)
     
-    # Convert to Neo4j format
-    print("Converting to Neo4j dataset...")
-    neo4j_data = create_neo4j_dataset(analysis_data)
-    
-    # Save output
-    print(f"Saving Neo4j dataset to {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(neo4j_data, f, indent=2)
+    # Convert to Neo4j format and save output
+    if jsonl_dir:
+        # Stream records straight to disk; the JSONL layout has no place for Cypher statements
+        output_file = jsonl_dir
+        print(f"Converting and streaming Neo4j dataset as JSONL to {output_file}...")
+        metadata = write_jsonl_dataset(iter_graph(analysis_data), output_file)
+    else:
+        print("Converting to Neo4j dataset...")
+        neo4j_data = create_neo4j_dataset(analysis_data)
+        metadata = neo4j_data['metadata']
+        
+        print(f"Saving Neo4j dataset to {output_file}...")
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(neo4j_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(neo4j_data, f, indent=2)
     
     # Print summary
     print("\n✅ Neo4j dataset created successfully!")
     print(f"\nSummary:")
-    print(f"- Total nodes: {neo4j_data['metadata']['total_nodes']}")
-    print(f"- Total relationships: {neo4j_data['metadata']['total_relationships']}")
+    print(f"- Total nodes: {metadata['total_nodes']}")
+    print(f"- Total relationships: {metadata['total_relationships']}")
     print(f"\nNode types:")
-    for node_type, count in neo4j_data['metadata']['node_types'].items():
+    for node_type, count in metadata['node_types'].items():
         print(f"  - {node_type}: {count}")
     print(f"\nRelationship types:")
-    for rel_type, count in neo4j_data['metadata']['relationship_types'].items():
+    for rel_type, count in metadata['relationship_types'].items():
         print(f"  - {rel_type}: {count}")
     
     print(f"\nOutput saved to: {output_file}")
     print("\nTo import into Neo4j:")
-    print("1. Use Neo4j Desktop or Aura")
-    print("2. Import the JSON using APOC procedures or")
-    print("3. Use the generated Cypher commands in 'cypher_import'")
+    if jsonl_dir:
+        print("1. Load nodes.jsonl first, e.g. with apoc.load.json (one record per line)")
+        print("2. Then load the rels_bin_*.jsonl files in parallel, one worker per bin;")
+        print("   'threads' in metadata.json is the number of bins")
+    else:
+        print("1. Use Neo4j Desktop or Aura")
+        print("2. Import the JSON using APOC procedures or")
+        print("3. Run the Cypher commands in 'cypher_import', passing 'nodes' and 'relationships' as $nodes and $relationships")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
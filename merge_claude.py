@@ -4,12 +4,12 @@ import sys
 from pathlib import Path
 
 
-def run(cmd, cwd, capture_output=False, allow_fail=False):
-    print(f"> {cmd}")
+def run(argv, cwd, capture_output=False, allow_fail=False):
+    print(f"> {' '.join(argv)}")
     result = subprocess.run(
-        cmd,
+        argv,
         cwd=cwd,
-        shell=True,
+        shell=False,
         text=True,
         encoding="utf-8",
         errors="replace",
@@ -48,10 +48,10 @@ print("✅ Starting automated merge...")
 print(f"Repo: {repo_path}")
 print(f"Merging: {merge_branch} → {main_branch}\n")
 
-run("git fetch --all", repo_path)
+run(["git", "fetch", "--all"], repo_path)
 
 commit_msg = run(
-    f"git log {remote}/{merge_branch} -1 --pretty=%B",
+    ["git", "log", f"{remote}/{merge_branch}", "-1", "--pretty=%B"],
     repo_path,
     capture_output=True,
     allow_fail=True
@@ -60,12 +60,12 @@ commit_msg = run(
 if not commit_msg:
     commit_msg = default_message
 
-run(f"git checkout {main_branch}", repo_path)
-run(f"git pull {remote} {main_branch}", repo_path)
+run(["git", "checkout", main_branch], repo_path)
+run(["git", "pull", remote, main_branch], repo_path)
 run(
-    f'git merge {remote}/{merge_branch} --no-ff -m "{commit_msg}"',
+    ["git", "merge", f"{remote}/{merge_branch}", "--no-ff", "-m", commit_msg],
     repo_path
 )
-run(f"git push {remote} {main_branch}", repo_path)
+run(["git", "push", remote, main_branch], repo_path)
 
 print("\n✅ Merge completed successfully.")
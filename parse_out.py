@@ -1,7 +1,21 @@
 import sys
+import re
 import json
 import os
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson reads integers beyond 64 bits as floats, json keeps them exact
+LONG_NUMBER = re.compile(rb"\d{19,}")
+
 def get_nested(data, path):
     """Retrieve nested JSON value based on dot-separated path."""
     keys = path.split(".")
@@ -12,6 +26,33 @@ def get_nested(data, path):
             raise KeyError(f"Path '{path}' not found in JSON")
     return data
 
+def load_json(raw):
+    """Parse JSON bytes with orjson where it gives the same result as json."""
+    if orjson is not None and not LONG_NUMBER.search(raw):
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN, which json accepts
+    return json.loads(raw)
+
+def extract_nested(input_file, path):
+    """Parse only the subtree at a dot-separated path, streaming when ijson is available."""
+    keys = path.split(".")
+    # ijson reads an empty path as the document root and an "item" segment as
+    # an array wildcard, so those paths are looked up in the parsed document
+    if ijson is not None and "" not in keys and "item" not in keys:
+        try:
+            with open(input_file, "rb") as f:
+                for value in ijson.items(f, path, use_float=True):
+                    return value
+            raise KeyError(f"Path '{path}' not found in JSON")
+        except ijson.JSONError:
+            pass  # e.g. integer overflow in the C backend; json parses it exactly
+
+    with open(input_file, "rb") as f:
+        data = load_json(f.read())
+    return get_nested(data, path)
+
 def main():
     if len(sys.argv) < 3:
         print("Usage: python script.py <input_file.json> <json_path>")
@@ -22,16 +63,13 @@ def main():
     output_file = "output.json"
 
     # Read input file
-    with open(input_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
     try:
-        extracted = get_nested(data, json_path)
+        extracted = extract_nested(input_file, json_path)
     except KeyError as e:
         print(e)
         sys.exit(1)
 
-    # Write output file
+    # Write output file (json.dump, as orjson writes NaN as null and rejects big integers)
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(extracted, f, indent=2, ensure_ascii=False)
 
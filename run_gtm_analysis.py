@@ -10,13 +10,51 @@ Options:
     --debug              Show debug information during analysis
     --exclude-paused     Exclude paused tags from analysis
     --skip-dashboard     Only run the analyzer, skip dashboard generation
+    --force              Re-run the analysis even if this export was analyzed before.
+                         Reports (and their console output) are cached under
+                         ~/.cache/gtm-analysis/ by export content; a repeat run
+                         replays the cached console report instead of re-analyzing
+    --quiet              Only write the report files, skip the console reports
     --output-dir DIR     Output directory for generated files (default: same as input)
 """
 
 import sys
 import os
+import io
 import re
 import json
+import contextlib
+
+# hashlib, shutil, importlib.util and the optional ijson/orjson are imported
+# where they are used, so usage and input errors exit without loading them
+
+
+# OS copy indicators like " (1)" and the whitespace they leave behind
+_COPY_RE = re.compile(r'\s*\(\d+\)')
+_DBLSPACE_RE = re.compile(r'  +')
+_SPACEDOT_RE = re.compile(r' \.')
+
+# Script name shown in the usage message, and the directory holding the sibling scripts
+_SCRIPT_NAME = os.path.basename(__file__)
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Reports keyed by export content, so re-downloads like "export (1).json" skip the analysis
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'gtm-analysis')
+
+# containerVersion sections read by GTMAnalyzer; everything else in the export is skipped
+_ANALYZER_SECTIONS = frozenset((
+    'variable', 'tag', 'trigger', 'transformation', 'client',
+    'customTemplate', 'folder', 'builtInVariable',
+))
+
+
+class ExportParseError(ValueError):
+    """The GTM export could not be parsed, or is not a GTM container export"""
+
+
+# Modules loaded from file paths, so repeated pipeline runs in one process
+# execute each script only once
+_MOD_CACHE = {}
 
 
 def clean_output_path(file_path):
@@ -26,37 +64,142 @@ def clean_output_path(file_path):
     was downloaded multiple times (e.g., "export (1).json").
     Returns the cleaned path (same directory, cleaned basename).
     """
-    dirname = os.path.dirname(file_path)
-    basename = os.path.basename(file_path)
-
-    copy_pattern = re.compile(r'\s*\(\d+\)')
-    clean_name = copy_pattern.sub('', basename)
-    # Collapse any resulting double spaces or leading/trailing spaces
-    clean_name = re.sub(r'  +', ' ', clean_name).strip()
-    # Handle case where space remains before extension: "file .json" -> "file.json"
-    clean_name = re.sub(r' \.', '.', clean_name)
+    dirname, basename = os.path.split(file_path)
+
+    # Most names have no copy indicator and nothing for the regexes to fix
+    if '(' not in basename and '  ' not in basename and ' .' not in basename:
+        clean_name = basename.strip()
+    else:
+        clean_name = _COPY_RE.sub('', basename)
+        # Collapse any resulting double spaces or leading/trailing spaces
+        clean_name = _DBLSPACE_RE.sub(' ', clean_name).strip()
+        # Handle case where space remains before extension: "file .json" -> "file.json"
+        clean_name = _SPACEDOT_RE.sub('.', clean_name)
 
     return os.path.join(dirname, clean_name) if dirname else clean_name
 
 
-def run_analyzer(file_path, debug_mode=False, include_paused=True):
-    """Run the GTM analyzer and return the report + output file path"""
+@contextlib.contextmanager
+def _buffered_stdout():
+    """Collect the many report print() calls and write them to stdout in one go"""
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            yield
+    finally:
+        # Also flushed on errors, so the partial report precedes the traceback
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+
+def _load_module(module_name, module_path):
+    """Load a script by file path (needed for the hyphen in gtm-analyzer.py), once per process"""
+    module = _MOD_CACHE.get(module_path)
+    if module is None:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(module_name, module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _MOD_CACHE[module_path] = module
+    return module
+
+
+def _load_export(file_path):
+    """Load the GTM export, streaming only the analyzer's sections when ijson is available"""
+    try:
+        import ijson
+    except ImportError:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            gtm_data = json.load(f)
+        # Same check as the streaming path below
+        container = gtm_data.get('containerVersion') if isinstance(gtm_data, dict) else None
+        if not isinstance(container, dict) or _ANALYZER_SECTIONS.isdisjoint(container):
+            raise ExportParseError("not a GTM container export")
+        return gtm_data
+
+    try:
+        with open(file_path, 'rb') as f:
+            sections = {
+                key: value
+                for key, value in ijson.kvitems(f, 'containerVersion', use_float=True)
+                if key in _ANALYZER_SECTIONS
+            }
+    except ijson.JSONError as e:
+        raise ExportParseError(str(e)) from e
+    # Valid JSON without a containerVersion object (or a non-object top level) yields nothing
+    if not sections:
+        raise ExportParseError("not a GTM container export")
+    return {'containerVersion': sections}
+
+
+def _analysis_cache_path(file_path, analyzer_path, include_paused):
+    """Cache file for this export content, analyzer source and paused-tags option"""
+    import hashlib
+    digest = hashlib.sha256()
+    for path in (file_path, analyzer_path):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    digest.update(b'include_paused' if include_paused else b'exclude_paused')
+    return os.path.join(CACHE_DIR, f'{digest.hexdigest()}.json')
+
+
+def _load_cached_report(cache_file):
+    """Return the cached report (or console text), or None if there is no usable cache entry"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _console_cache_path(cache_file):
+    """Sibling cache file holding the console report printed for a cached analysis"""
+    return f'{os.path.splitext(cache_file)[0]}.console.json'
+
+
+@_buffered_stdout()
+def run_analyzer(file_path, debug_mode=False, include_paused=True, use_cache=True, quiet=False):
+    """Run the GTM analyzer and return the report + output file path
+
+    With quiet=True the console reports are not built at all, not just hidden.
+    """
+    import shutil
+
     # Import the analyzer module
-    # Handle the hyphen in the filename by using importlib
-    import importlib.util
-    analyzer_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gtm-analyzer.py')
+    analyzer_path = os.path.join(_HERE, 'gtm-analyzer.py')
 
     if not os.path.exists(analyzer_path):
         print(f"ERROR: Analyzer script not found at: {analyzer_path}")
         sys.exit(1)
 
-    spec = importlib.util.spec_from_file_location("gtm_analyzer", analyzer_path)
-    gtm_analyzer_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(gtm_analyzer_module)
-
-    # Load the GTM export file
-    with open(file_path, 'r', encoding='utf-8') as f:
-        gtm_data = json.load(f)
+    # Use cleaned path so copy indicators like (1) are stripped
+    clean_path = clean_output_path(file_path)
+    root, ext = os.path.splitext(clean_path)
+    output_file = f'{root}_analysis_report{ext}'
+
+    # Debug runs always analyze, since their output is the point
+    cache_file = None
+    if use_cache and not debug_mode:
+        cache_file = _analysis_cache_path(file_path, analyzer_path, include_paused)
+        report = _load_cached_report(cache_file)
+        # Entries written by a --quiet run have no console text; re-analyze those unless quiet
+        console = None if quiet else _load_cached_report(_console_cache_path(cache_file))
+        if report is not None and (quiet or console is not None):
+            print(f"This export was analyzed before; reusing cached report {cache_file}")
+            print("  (pass --force to re-run the analysis)\n")
+            if not quiet:
+                sys.stdout.write(console['report'])
+            shutil.copyfile(cache_file, output_file)
+            print(f"\nAnalysis report saved to: {output_file}")
+            if not quiet:
+                sys.stdout.write(console['unknown_types'])
+            return report, output_file
+
+    # Load the GTM export file first, so invalid JSON fails before the analyzer module is executed
+    gtm_data = _load_export(file_path)
+
+    gtm_analyzer_module = _load_module("gtm_analyzer", analyzer_path)
 
     # Create analyzer instance
     analyzer = gtm_analyzer_module.GTMAnalyzer(gtm_data, include_paused_tags=include_paused)
@@ -68,61 +211,111 @@ def run_analyzer(file_path, debug_mode=False, include_paused=True):
         analyzer.find_unused_variables(debug=True)
         print("\n" + "=" * 80 + "\n")
 
+    # Console report text is captured as well, so a cache hit can replay it
+    report_text = io.StringIO()
+    with contextlib.redirect_stdout(report_text):
+        report, trigger_impact, tag_impact = _analyze(analyzer, quiet)
+    sys.stdout.write(report_text.getvalue())
+
+    # Add evaluation impacts to report
+    report['trigger_evaluation_impact'] = trigger_impact
+    report['tag_evaluation_impact'] = tag_impact
+
+    # Save report to JSON file
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+    if orjson is not None:
+        # NON_STR_KEYS stringifies int keys the way json.dump does
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        # json.dump emits many small fragments; a 1 MiB buffer batches them into few writes
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            json.dump(report, f, indent=2)
+
+    print(f"\nAnalysis report saved to: {output_file}")
+
+    # Print unknown types report
+    unknown_text = io.StringIO()
+    if not quiet:
+        with contextlib.redirect_stdout(unknown_text):
+            analyzer.print_unknown_types_report()
+        sys.stdout.write(unknown_text.getvalue())
+
+    if cache_file:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            shutil.copyfile(output_file, cache_file)
+            if not quiet:
+                console = {'report': report_text.getvalue(), 'unknown_types': unknown_text.getvalue()}
+                with open(_console_cache_path(cache_file), 'w', encoding='utf-8') as f:
+                    json.dump(console, f)
+        except OSError as e:
+            print(f"WARNING: Could not cache analysis report: {e}")
+
+    return report, output_file
+
+
+def _analyze(analyzer, quiet):
+    """Build the report and evaluation impacts, printing the console reports unless quiet"""
     # Generate detailed report with usage counts
     report = analyzer.generate_detailed_report()
 
     # Print report to console
-    analyzer.print_report(report)
+    if not quiet:
+        analyzer.print_report(report)
 
     # Generate and print trigger evaluation impact
     trigger_impact = analyzer.analyze_trigger_evaluation_impact()
-    analyzer.print_trigger_evaluation_impact_report(trigger_impact)
+    if not quiet:
+        analyzer.print_trigger_evaluation_impact_report(trigger_impact)
 
     # Generate and print tag evaluation impact
     tag_impact = analyzer.analyze_tag_evaluation_impact()
-    analyzer.print_tag_evaluation_impact_report(tag_impact)
+    if not quiet:
+        analyzer.print_tag_evaluation_impact_report(tag_impact)
 
     # Print combined re-evaluation report
-    analyzer.print_combined_reevaluation_report(trigger_impact, tag_impact)
-
-    # Add evaluation impacts to report
-    report['trigger_evaluation_impact'] = trigger_impact
-    report['tag_evaluation_impact'] = tag_impact
+    if not quiet:
+        analyzer.print_combined_reevaluation_report(trigger_impact, tag_impact)
 
-    # Save report to JSON file — use cleaned path so copy indicators like (1) are stripped
-    clean_path = clean_output_path(file_path)
-    output_file = clean_path.replace('.json', '_analysis_report.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2)
+    return report, trigger_impact, tag_impact
 
-    print(f"\nAnalysis report saved to: {output_file}")
 
-    # Print unknown types report
-    analyzer.print_unknown_types_report()
+def run_analyzer_many(file_paths, debug_mode=False, include_paused=True, quiet=False):
+    """Run the analyzer over several GTM exports in one process and return [(report, output_file), ...]
 
-    return report, output_file
+    The analyzer module is loaded once and shared; each container still gets
+    its own GTMAnalyzer, since the analyzer state is built from one export.
+    """
+    return [
+        run_analyzer(file_path, debug_mode, include_paused, quiet=quiet)
+        for file_path in file_paths
+    ]
 
 
+@_buffered_stdout()
 def run_dashboard(analysis_data, analysis_file_path):
-    """Run the static dashboard generator"""
+    """Run the static dashboard generator
+
+    The report is passed in memory; analysis_file_path is only used to name
+    the HTML file, so the just-written report is never parsed again.
+    """
     # Import the dashboard module
-    import importlib.util
-    dashboard_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gtm_dashboard_static.py')
+    dashboard_path = os.path.join(_HERE, 'gtm_dashboard_static.py')
 
     if not os.path.exists(dashboard_path):
         print(f"ERROR: Dashboard script not found at: {dashboard_path}")
         sys.exit(1)
 
-    spec = importlib.util.spec_from_file_location("gtm_dashboard_static", dashboard_path)
-    dashboard_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(dashboard_module)
+    dashboard_module = _load_module("gtm_dashboard_static", dashboard_path)
 
     # Generate output filename based on analysis file
-    base_name = os.path.basename(analysis_file_path)
-    if base_name.endswith('_analysis_report.json'):
-        base_name = base_name[:-21]
-    elif base_name.endswith('.json'):
-        base_name = base_name[:-5]
+    base_name = os.path.splitext(os.path.basename(analysis_file_path))[0]
+    if base_name.endswith('_analysis_report'):
+        base_name = base_name[:-len('_analysis_report')]
 
     output_dir = os.path.dirname(analysis_file_path) or '.'
     output_filename = os.path.join(output_dir, f'gtm_dashboard_{base_name}.html')
@@ -138,25 +331,31 @@ def main():
         print("GTM Container Analysis Pipeline")
         print("=" * 40)
         print()
-        print(f"Usage: python {os.path.basename(__file__)} <path_to_gtm_export.json> [options]")
+        print(f"Usage: python {_SCRIPT_NAME} <path_to_gtm_export.json> [options]")
         print()
         print("Options:")
         print("  --debug              Show debug information during analysis")
         print("  --exclude-paused     Exclude paused tags from analysis")
         print("  --skip-dashboard     Only run the analyzer, skip dashboard generation")
+        print("  --quiet              Only write the report files, skip the console reports")
+        print("  --force              Re-run the analysis even if this export was analyzed before")
         print()
         print("Example:")
-        print(f"  python {os.path.basename(__file__)} GTM-MHKFW34_workspace473.json")
-        print(f"  python {os.path.basename(__file__)} GTM-MHKFW34_workspace473.json --exclude-paused")
+        print(f"  python {_SCRIPT_NAME} GTM-MHKFW34_workspace473.json")
+        print(f"  python {_SCRIPT_NAME} GTM-MHKFW34_workspace473.json --exclude-paused")
         sys.exit(1)
 
     file_path = sys.argv[1]
-    debug_mode = '--debug' in sys.argv
-    include_paused = '--exclude-paused' not in sys.argv
-    skip_dashboard = '--skip-dashboard' in sys.argv
+    flags = frozenset(sys.argv[2:])
+    debug_mode = '--debug' in flags
+    include_paused = '--exclude-paused' not in flags
+    skip_dashboard = '--skip-dashboard' in flags
+    use_cache = '--force' not in flags
+    quiet = '--quiet' in flags
 
     # --- Step 0: Validate the input file ---
-    if not os.path.exists(file_path):
+    # One stat call; also rejects directories, which would otherwise fail later in open()
+    if not os.path.isfile(file_path):
         print(f"ERROR: File '{file_path}' not found.")
         sys.exit(1)
 
@@ -171,8 +370,8 @@ def main():
     print()
 
     try:
-        report, analysis_file = run_analyzer(file_path, debug_mode, include_paused)
-    except json.JSONDecodeError as e:
+        report, analysis_file = run_analyzer(file_path, debug_mode, include_paused, use_cache, quiet)
+    except (json.JSONDecodeError, ExportParseError) as e:
         print(f"ERROR: Invalid JSON file. {e}")
         sys.exit(1)
     except Exception as e:
@@ -1,17 +1,18 @@
-import dash
-from dash import html, dcc
-import sys
+if __name__ == '__main__':
+    # Dash is only imported when run as a script, so importing this file
+    # (e.g. during test collection) does not load Dash/Flask
+    import dash
+    from dash import html
 
-print("Testing Dash installation...")
+    print("Testing Dash installation...")
 
-app = dash.Dash(__name__)
+    app = dash.Dash(__name__)
 
-app.layout = html.Div([
-    html.H1("Dash Test"),
-    html.P("If you see this, Dash is working!")
-])
+    app.layout = html.Div([
+        html.H1("Dash Test"),
+        html.P("If you see this, Dash is working!")
+    ])
 
-if __name__ == '__main__':
     print("Starting test server on http://127.0.0.1:8050")
     try:
         app.run(debug=True, host='127.0.0.1', port=8050)
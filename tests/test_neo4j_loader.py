@@ -0,0 +1,55 @@
+"""Tests for the Cypher text and parameters built by gtm_neo4j_loader"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gtm_neo4j_loader import GTMContainerGraphLoader, _quote_name
+
+
+class QuoteNameTest(unittest.TestCase):
+    def test_plain_name_is_backtick_quoted(self):
+        self.assertEqual(_quote_name("Variable"), "`Variable`")
+
+    def test_backticks_are_doubled(self):
+        self.assertEqual(_quote_name("Odd`Label"), "`Odd``Label`")
+        self.assertEqual(_quote_name("`) DETACH DELETE (n"), "```) DETACH DELETE (n`")
+
+
+class BatchQueryTest(unittest.TestCase):
+    # Quotes and a newline, which broke the old property literals spliced into the query
+    VALUE = 'O\'Brien \n "quoted"'
+
+    def setUp(self):
+        # The driver connects lazily, so building the batches needs no server
+        self.loader = GTMContainerGraphLoader("bolt://localhost:7687", "neo4j", "password")
+
+    def tearDown(self):
+        self.loader.close()
+
+    def test_node_property_values_are_parameters(self):
+        nodes = [{'id': 'var_1', 'labels': ['Variable', 'Odd`Label'], 'properties': {'name': self.VALUE}}]
+        [(_, query, rows)] = self.loader._node_batches(nodes, batch_size=10)
+
+        self.assertEqual(
+            query,
+            "UNWIND $rows AS row CREATE (n:Node:`Variable`:`Odd``Label`) SET n = row.props, n.id = row.id",
+        )
+        self.assertEqual(rows, [{'id': 'var_1', 'props': {'name': self.VALUE}}])
+        self.assertNotIn("O'Brien", query)
+
+    def test_relationship_property_values_are_parameters(self):
+        relationships = [{'startNode': 'tag_1', 'endNode': 'var_1', 'type': 'USES`VARIABLE',
+                          'properties': {'note': self.VALUE}}]
+        [(_, query, rows)] = self.loader._relationship_batches(relationships, batch_size=10)
+
+        self.assertIn("CREATE (a)-[x:`USES``VARIABLE`]->(b)", query)
+        self.assertIn("SET x = r.props", query)
+        self.assertEqual(rows, [{'s': 'tag_1', 'e': 'var_1', 'props': {'note': self.VALUE}}])
+        self.assertNotIn("O'Brien", query)
+
+
+if __name__ == '__main__':
+    unittest.main()